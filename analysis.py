@@ -0,0 +1,119 @@
+"""Análisis masivo de posiciones con HexPlayer repartido en un pool de procesos
+
+    for index, stats in analyze_positions(positions, 0.5, workers=4):
+        print(index, stats.move, stats.score, stats.depth)
+
+Cada posición es un HexBoard (mueve quien tenga menos fichas, o el jugador 1
+si empatan) o un par (HexBoard, jugador). Los resultados salen en el orden en
+que terminan, con el índice de la posición en la entrada. Nunca hay más de
+`max_pending` posiciones leídas sin resultado, así que la entrada puede ser
+un generador sobre millones de posiciones.
+
+Uso desde la línea de órdenes, sobre un archivo de records.py:
+    python analysis.py partidas.bin --time 0.5 --workers 4
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from board import HexBoard
+from player import HexPlayer
+from records import read_records
+
+# Jugadores de cada proceso por (jugador, tamaño): pesos, geometría y tablas se reutilizan
+_ANALYSTS = {}
+
+
+def _pack(position) -> tuple:
+    """(tamaño, bits del jugador 1, bits del jugador 2, jugador que mueve): barato de enviar"""
+    if isinstance(position, HexBoard):
+        board, player_id = position, 1 + (position.bits[1].bit_count() > position.bits[2].bit_count())
+    else:
+        board, player_id = position
+    return board.size, board.bits[1], board.bits[2], player_id
+
+
+def _unpack(size: int, bits_1: int, bits_2: int) -> HexBoard:
+    board = HexBoard(size)
+    for player_id, bits in ((1, bits_1), (2, bits_2)):
+        while bits:
+            low = bits & -bits
+            board.play(*divmod(low.bit_length() - 1, size), player_id)
+            bits ^= low
+    return board
+
+
+def _analyze(packed: tuple, time_per_position: float):
+    """SearchStats de la jugada de HexPlayer en la posición (en un proceso del pool)"""
+    size, bits_1, bits_2, player_id = packed
+    player = _ANALYSTS.get((player_id, size))
+    if player is None:
+        player = _ANALYSTS[(player_id, size)] = HexPlayer(player_id)
+    records = []
+    player.on_stats = records.append
+    player.play(_unpack(size, bits_1, bits_2), time_per_position)
+    return records[0]
+
+
+def analyze_positions(positions, time_per_position: float, workers: int = 1,
+                      max_pending: int = None, executor: ProcessPoolExecutor = None):
+    """Genera (índice, SearchStats) por cada posición: mejor jugada, valor, profundidad, variante
+
+    Con workers = 1 y sin `executor` se analiza en este proceso. Se puede
+    pasar un ProcessPoolExecutor propio para reutilizarlo entre llamadas; si
+    no, el pool vive lo que dure el generador.
+    """
+    if workers <= 1 and executor is None:
+        for index, position in enumerate(positions):
+            yield index, _analyze(_pack(position), time_per_position)
+        return
+    pool = executor if executor is not None else ProcessPoolExecutor(max_workers=workers)
+    max_pending = max_pending or 2 * workers
+    pending = {}
+    positions = enumerate(positions)
+    try:
+        exhausted = False
+        while True:
+            # Solo se lee más entrada cuando hay hueco (contrapresión)
+            while not exhausted and len(pending) < max_pending:
+                item = next(positions, None)
+                if item is None:
+                    exhausted = True
+                    break
+                index, position = item
+                pending[pool.submit(_analyze, _pack(position), time_per_position)] = index
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+
+
+def record_positions(path: str):
+    """(partida, jugada, jugada hecha, (tablero, jugador)) de cada posición del archivo"""
+    for game, record in enumerate(read_records(path)):
+        for ply, (board, move, player_id) in enumerate(record.positions()):
+            # _pack copia los bits; el tablero de positions() se reutiliza
+            yield game, ply, move, (board, player_id)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Analiza con HexPlayer cada posición de un archivo de partidas")
+    parser.add_argument('records')
+    parser.add_argument('--time', type=float, default=0.5, help="segundos por posición")
+    parser.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args()
+    played = {}
+
+    def positions():
+        for number, (game, ply, move, position) in enumerate(record_positions(args.records)):
+            played[number] = (game, ply, move)
+            yield position
+
+    for number, stats in analyze_positions(positions(), args.time, args.workers):
+        game, ply, move = played.pop(number)
+        mark = '' if stats.move == move else f"  (jugada {move})"
+        print(f"partida {game} jugada {ply}: {stats.move} valor {stats.score} profundidad {stats.depth}{mark}")
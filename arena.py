@@ -0,0 +1,254 @@
+"""Torneos sin interfaz entre dos motores en un pool de procesos
+
+Uso:
+    python arena.py hex ai --games 200 --sizes 7,9,11 --time 0.2 --workers 4 --out arena.json
+
+Los colores se alternan por parejas de partidas que comparten la misma
+apertura aleatoria, así que ninguna apertura favorece a un motor. Cada
+partida se juega completa en un proceso sin dibujar el tablero; al final se
+muestran los porcentajes de victoria con intervalos de Wilson y la diferencia
+de Elo, y se escribe un JSON con la configuración, el resumen y cada partida.
+"""
+import argparse
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from board import HexBoard
+from opening_book import parse_sizes
+from patterns import warm_up
+from player import HexPlayer, MCTSPlayer
+from records import GameRecord, RecordWriter
+from testplayer import AIPlayer
+
+# Cuantil normal de los intervalos de confianza (95 %)
+Z_95 = 1.959964
+# Motores disponibles por nombre (AIPlayer recibe el tiempo por jugada en el constructor)
+ENGINES = ('hex', 'ai', 'mcts')
+
+
+def _make_player(engine: str, player_id: int, move_time: float, game_time: float):
+    if engine == 'hex':
+        return HexPlayer(player_id, game_time=game_time)
+    if engine == 'ai':
+        return AIPlayer(player_id, move_time, game_time=game_time)
+    if engine == 'mcts':
+        return MCTSPlayer(player_id, game_time=game_time)
+    raise ValueError(f"Motor desconocido: {engine}")
+
+
+def _move(engine: str, player, board: HexBoard, move_time: float) -> tuple:
+    if engine == 'ai':
+        return player.play(board)
+    return player.play(board, move_time)
+
+
+def random_opening(size: int, plies: int, seed: int) -> list:
+    """Jugadas aleatorias alternas (empezando por el jugador 1) que no terminan la partida"""
+    rng = random.Random(seed)
+    board = HexBoard(size)
+    moves = []
+    player_id = 1
+    while len(moves) < plies:
+        move = rng.choice(board.get_possible_moves())
+        board.place_piece(*move, player_id)
+        if board.check_connection(player_id):
+            board.undo()
+            continue
+        moves.append(move)
+        player_id = 3 - player_id
+    return moves
+
+
+def play_game(game: int, size: int, engines: tuple, move_time: float, game_time: float,
+              opening: list) -> dict:
+    """Juega una partida completa; engines[0] es el jugador 1
+
+    Una jugada ilegal o una excepción del motor pierden la partida.
+    """
+    board = HexBoard(size)
+    for index, move in enumerate(opening):
+        board.place_piece(*move, 1 + index % 2)
+    players = {player_id: _make_player(engines[player_id - 1], player_id, move_time, game_time)
+               for player_id in (1, 2)}
+    times = {1: [], 2: []}
+    moves = []
+    player_id = 1 + len(opening) % 2
+    winner, reason = None, 'connection'
+    started = time.monotonic()
+    try:
+        while winner is None:
+            engine = engines[player_id - 1]
+            move_start = time.monotonic()
+            try:
+                move = _move(engine, players[player_id], board, move_time)
+            except Exception as error:
+                winner, reason = 3 - player_id, f"error: {error!r}"
+                break
+            times[player_id].append(time.monotonic() - move_start)
+            if move is None or tuple(move) not in board.get_possible_moves():
+                winner, reason = 3 - player_id, f"jugada ilegal {move}"
+                break
+            board.place_piece(move[0], move[1], player_id)
+            moves.append(list(move))
+            if board.check_connection(player_id):
+                winner = player_id
+            player_id = 3 - player_id
+    finally:
+        for player in players.values():
+            if isinstance(player, HexPlayer):
+                player.stop_pondering()
+                player.close()
+    return {
+        'game': game,
+        'size': size,
+        'player1': engines[0],
+        'player2': engines[1],
+        'winner': winner,
+        'winner_engine': engines[winner - 1],
+        'reason': reason,
+        'opening': [list(move) for move in opening],
+        'moves': moves,
+        'plies': len(opening) + len(moves),
+        'seconds': time.monotonic() - started,
+        'max_move_time': {engines[0]: max(times[1], default=0.0), engines[1]: max(times[2], default=0.0)},
+    }
+
+
+def schedule(first: str, second: str, games: int, sizes: list, opening_plies: int, seed: int):
+    """(partida, tamaño, motores, apertura): parejas con la misma apertura y colores cambiados"""
+    for game in range(games):
+        pair = game // 2
+        size = sizes[pair % len(sizes)]
+        opening = random_opening(size, opening_plies, seed * 1000003 + pair) if opening_plies else []
+        engines = (first, second) if game % 2 == 0 else (second, first)
+        yield game, size, engines, opening
+
+
+def wilson_interval(wins: float, games: int, z: float = Z_95) -> tuple:
+    """Intervalo de Wilson para la proporción de victorias"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denominator
+    spread = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+
+def elo_difference(score: float) -> float:
+    """Diferencia de Elo que corresponde a una puntuación esperada (±inf en los extremos)"""
+    if score <= 0.0:
+        return -math.inf
+    if score >= 1.0:
+        return math.inf
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def summarize(results: list, first: str, second: str) -> dict:
+    """Victorias de `first` contra `second` en total, por color y por tamaño"""
+    def score(games: list) -> dict:
+        wins = sum(1 for result in games if result['winner_engine'] == first)
+        low, high = wilson_interval(wins, len(games))
+        rate = wins / len(games) if games else 0.0
+        return {
+            'games': len(games),
+            'wins': wins,
+            'losses': len(games) - wins,
+            'win_rate': rate,
+            'ci95': [low, high],
+            'elo': _finite(elo_difference(rate)),
+            'elo_ci95': [_finite(elo_difference(low)), _finite(elo_difference(high))],
+        }
+
+    summary = score(results)
+    summary['engines'] = [first, second]
+    summary['as_player1'] = score([result for result in results if result['player1'] == first])
+    summary['as_player2'] = score([result for result in results if result['player2'] == first])
+    summary['by_size'] = {str(size): score([result for result in results if result['size'] == size])
+                          for size in sorted({result['size'] for result in results})}
+    summary['errors'] = sum(1 for result in results if result['reason'] != 'connection')
+    return summary
+
+
+def _finite(value: float):
+    # JSON no admite infinitos
+    return value if math.isfinite(value) else None
+
+
+def run_tournament(first: str, second: str, games: int = 100, sizes=(7,), move_time: float = 0.2,
+                   game_time: float = None, opening_plies: int = 2, workers: int = 1, seed: int = 0,
+                   progress: bool = False, records: str = None) -> dict:
+    """Juega `games` partidas en `workers` procesos y devuelve {'config', 'summary', 'games'}
+
+    Con `records` cada partida terminada se añade a ese archivo binario (records.py).
+    """
+    for engine in (first, second):
+        if engine not in ENGINES:
+            raise ValueError(f"Motor desconocido: {engine}")
+    sizes = list(sizes)
+    config = {'engines': [first, second], 'games': games, 'sizes': sizes, 'move_time': move_time,
+              'game_time': game_time, 'opening_plies': opening_plies, 'workers': workers, 'seed': seed}
+    results = []
+    writer = RecordWriter(records, append=True) if records is not None else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm_up, initargs=(sizes,)) as pool:
+        futures = [pool.submit(play_game, game, size, engines, move_time, game_time, opening)
+                   for game, size, engines, opening in schedule(first, second, games, sizes, opening_plies, seed)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if writer is not None:
+                writer.write(GameRecord(result['size'], (result['player1'], result['player2']),
+                                        result['winner'], result['opening'] + result['moves']))
+            if progress:
+                wins = sum(1 for other in results if other['winner_engine'] == first)
+                print(f"\r{len(results)}/{games} partidas, {first} {wins}-{len(results) - wins} {second}",
+                      end='', flush=True)
+    if writer is not None:
+        writer.close()
+    if progress:
+        print()
+    results.sort(key=lambda result: result['game'])
+    return {'config': config, 'summary': summarize(results, first, second), 'games': results}
+
+
+def format_summary(summary: dict) -> str:
+    first, second = summary['engines']
+
+    def line(label: str, stats: dict) -> str:
+        low, high = stats['ci95']
+        elo = stats['elo']
+        elo_text = f"{elo:+.0f}" if elo is not None else ('+inf' if stats['wins'] else '-inf')
+        return (f"{label:<12} {stats['wins']:>5}-{stats['losses']:<5} {100 * stats['win_rate']:6.1f}% "
+                f"[{100 * low:5.1f}%, {100 * high:5.1f}%]  Elo {elo_text}")
+
+    lines = [f"{first} contra {second}", line('total', summary),
+             line('jugador 1', summary['as_player1']), line('jugador 2', summary['as_player2'])]
+    lines += [line(f"{size}x{size}", stats) for size, stats in summary['by_size'].items()]
+    if summary['errors']:
+        lines.append(f"{summary['errors']} partidas terminadas por error o jugada ilegal")
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Torneo entre dos motores de Hex")
+    parser.add_argument('first', choices=ENGINES)
+    parser.add_argument('second', choices=ENGINES)
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--sizes', default='7')
+    parser.add_argument('--time', type=float, default=0.2, help="segundos por jugada")
+    parser.add_argument('--game-time', type=float, default=None, help="presupuesto por partida y jugador")
+    parser.add_argument('--openings', type=int, default=2, help="jugadas aleatorias al empezar")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default=None, help="archivo JSON con los resultados")
+    parser.add_argument('--records', default=None, help="archivo binario de partidas (records.py)")
+    args = parser.parse_args()
+    report = run_tournament(args.first, args.second, args.games, parse_sizes(args.sizes), args.time,
+                            args.game_time, args.openings, args.workers, args.seed, progress=True,
+                            records=args.records)
+    print(format_summary(report['summary']))
+    if args.out:
+        with open(args.out, 'w') as out_file:
+            json.dump(report, out_file, indent=1)
@@ -0,0 +1,157 @@
+"""Micro y macro benchmarks de los caminos críticos del tablero y los motores
+
+Uso:
+    python -m benchmarks.hot_paths                          # medir y mostrar
+    python -m benchmarks.hot_paths --save base.json         # guardar la línea base
+    python -m benchmarks.hot_paths --compare base.json      # fallar si algo va más lento
+
+Las posiciones son fijas (semilla por tamaño). Las micro se miden en
+operaciones por segundo (la mejor de varias repeticiones) y las macro, una
+llamada completa a play(), en nodos por segundo. Con --compare el proceso
+termina con código 1 si algún resultado cae más de --threshold respecto a la
+línea base.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from board import HexBoard
+from opening_book import parse_sizes
+from patterns import warm_up
+from player import HexPlayer
+from testplayer import AIPlayer
+from benchmarks.search_nodes import make_position
+
+SIZES = (7, 11, 15, 19)
+# Fracción del tablero ocupada en cada posición de prueba
+PHASES = {'empty': 0.0, 'mid': 0.4, 'full': 0.85}
+SEED = 2024
+
+
+def position(size: int, phase: str) -> HexBoard:
+    """Posición fija de la fase dada (sin conexiones completas)"""
+    return make_position(size, int(PHASES[phase] * size * size), SEED + size)
+
+
+def measure(function, min_time: float = 0.2, repeats: int = 3) -> float:
+    """Operaciones por segundo de `function()`: la mejor de `repeats` tandas de al menos min_time"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time / 10:
+            break
+        number *= 10
+    number = max(1, int(number * min_time / elapsed))
+    best = 0.0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = max(best, number / (time.perf_counter() - started))
+    return best
+
+
+def _place_and_undo(board: HexBoard):
+    row, col = board.get_possible_moves()[0]
+    return lambda: (board.place_piece(row, col, 1), board.undo())
+
+
+def micro_benchmarks(size: int) -> dict:
+    """{nombre: función sin argumentos} para un tamaño"""
+    boards = {phase: position(size, phase) for phase in PHASES}
+    mid = boards['mid']
+    hex_player = HexPlayer(1)
+    hex_player.size = size
+    hex_player.calculate_weights()
+    ai_player = AIPlayer(1)
+    ai_player.size = size
+    moves = mid.get_possible_moves()
+
+    def ai_evaluate():
+        # Sin la caché de evaluaciones se mide la función completa
+        ai_player.eval_cache.clear()
+        ai_player._evaluate(mid)
+
+    benchmarks = {
+        f'HexBoard.clone/{size}': mid.clone,
+        f'HexBoard.place_piece/{size}': _place_and_undo(mid),
+        f'HexBoard.get_possible_moves/{size}': mid.get_possible_moves,
+    }
+    for phase, board in boards.items():
+        benchmarks[f'HexBoard.check_connection/{size}/{phase}'] = lambda board=board: board.check_connection(1)
+    benchmarks[f'HexPlayer.order_moves/{size}'] = lambda: hex_player.order_moves(moves, mid)
+    benchmarks[f'HexPlayer.simple_evaluate/{size}'] = lambda: hex_player.simple_evaluate(mid)
+    benchmarks[f'AIPlayer._evaluate/{size}'] = ai_evaluate
+    return benchmarks
+
+
+def macro_benchmarks(size: int, move_time: float) -> dict:
+    """{nombre: nodos por segundo} de una jugada completa desde la posición de medio juego"""
+    board = position(size, 'mid')
+    results = {}
+    hex_player = HexPlayer(1 + (board.bits[1].bit_count() > board.bits[2].bit_count()))
+    started = time.perf_counter()
+    hex_player.play(board, move_time)
+    results[f'HexPlayer.play/{size}'] = hex_player.clock.nodes / (time.perf_counter() - started)
+    ai_player = AIPlayer(hex_player.player_id, move_time)
+    started = time.perf_counter()
+    ai_player.play(board)
+    results[f'AIPlayer.play/{size}'] = ai_player.nodes_evaluated / (time.perf_counter() - started)
+    return results
+
+
+def run(sizes=SIZES, min_time: float = 0.2, move_time: float = 1.0, verbose: bool = False) -> dict:
+    """{'platform', 'results': {nombre: {'value', 'unit'}}}"""
+    results = {}
+
+    def report(name: str, value: float, unit: str):
+        results[name] = {'value': value, 'unit': unit}
+        if verbose:
+            print(f"{name:<42} {value:>14,.0f} {unit}")
+
+    # Las plantillas de borde se calculan una vez por proceso; no se cuentan
+    warm_up(sizes)
+    for size in sizes:
+        for name, function in micro_benchmarks(size).items():
+            report(name, measure(function, min_time), 'ops/s')
+        if move_time > 0:
+            for name, value in macro_benchmarks(size, move_time).items():
+                report(name, value, 'nodes/s')
+    return {'platform': {'python': platform.python_version(), 'machine': platform.machine()},
+            'results': results}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """(nombre, base, actual) de los resultados más lentos que (1 - threshold) * base"""
+    regressions = []
+    for name, entry in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is not None and entry['value'] < (1.0 - threshold) * base['value']:
+            regressions.append((name, base['value'], entry['value']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmarks de HexBoard, HexPlayer y AIPlayer")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)))
+    parser.add_argument('--min-time', type=float, default=0.2, help="segundos por tanda de cada micro")
+    parser.add_argument('--move-time', type=float, default=1.0, help="segundos de play() (0: sin macro)")
+    parser.add_argument('--save', default=None, help="guardar los resultados como línea base JSON")
+    parser.add_argument('--compare', default=None, help="línea base JSON con la que comparar")
+    parser.add_argument('--threshold', type=float, default=0.2, help="caída relativa tolerada")
+    args = parser.parse_args()
+    current = run(parse_sizes(args.sizes), args.min_time, args.move_time, verbose=True)
+    if args.save:
+        with open(args.save, 'w') as out_file:
+            json.dump(current, out_file, indent=1)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(current, json.load(baseline_file), args.threshold)
+        for name, base, value in regressions:
+            print(f"MÁS LENTO: {name}: {value:,.0f} frente a {base:,.0f} ({100 * (value / base - 1):+.1f}%)")
+        if regressions:
+            sys.exit(1)
@@ -0,0 +1,57 @@
+"""Nodos por profundidad de HexPlayer con y sin killers, historia, PVS y aspiración
+
+Uso: python -m benchmarks.search_nodes [profundidad máxima]
+"""
+import math
+import random
+import sys
+from board import HexBoard, random_position
+from player import HexPlayer
+
+# Posiciones fijas: (tamaño, fichas colocadas al azar, semilla)
+POSITIONS = [(7, 8, 1), (7, 14, 2), (9, 10, 3), (9, 20, 4), (11, 16, 5), (11, 30, 6)]
+
+
+def make_position(size: int, stones: int, seed: int) -> HexBoard:
+    """Tablero con fichas alternas al azar, sin ninguna conexión completa"""
+    return random_position(size, stones, random.Random(seed))
+
+
+def count_nodes(board: HexBoard, max_depth: int, search_heuristics: bool) -> list:
+    """(nodos, valor) de cada iteración de la profundidad iterativa hasta max_depth"""
+    player_id = 1 + (board.bits[1].bit_count() > board.bits[2].bit_count())
+    player = HexPlayer(player_id, search_heuristics=search_heuristics)
+    player.size = board.size
+    player.calculate_weights()
+    player.tt.new_search()
+    player.clock.start_infinite()
+    board = board.clone()
+    moves = board.get_possible_moves()
+    
+    results = []
+    for depth in range(1, max_depth + 1):
+        nodes = player.clock.nodes
+        # Igual que HexPlayer.search: aspiración sobre la profundidad de la misma paridad
+        guess = results[depth - 3][1] if depth > 2 else -math.inf
+        _, value = player.aspiration_search(board, moves, depth, guess)
+        results.append((player.clock.nodes - nodes, value))
+    return results
+
+
+def main(max_depth: int = 4):
+    totals = {False: [0] * max_depth, True: [0] * max_depth}
+    for size, stones, seed in POSITIONS:
+        board = make_position(size, stones, seed)
+        for search_heuristics in (False, True):
+            for depth, (nodes, _) in enumerate(count_nodes(board, max_depth, search_heuristics)):
+                totals[search_heuristics][depth] += nodes
+    
+    print(f"{'prof.':>5} {'alfa-beta':>12} {'mejorada':>12} {'reducción':>10}")
+    for depth in range(max_depth):
+        base, improved = totals[False][depth], totals[True][depth]
+        reduction = 100.0 * (1.0 - improved / base) if base else 0.0
+        print(f"{depth + 1:>5} {base:>12} {improved:>12} {reduction:>9.1f}%")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 4)
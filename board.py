@@ -1,7 +1,37 @@
+import random
+import numpy as np
+from geometry import get_geometry
+
 class HexBoard:
-    def __init__(self, size: int):
+    def __init__(self, size: int, use_numpy: bool = False):
         self.size = size
-        self.board = [[0 for _ in range(size)] for _ in range(size)]
+        self.geometry = get_geometry(size)
+        # Opcionalmente el tablero es una matriz int8 de NumPy (board[i][j] sigue valiendo)
+        self.use_numpy = use_numpy
+        if use_numpy:
+            self.board = np.zeros((size, size), dtype=np.int8)
+        else:
+            self.board = [[0 for _ in range(size)] for _ in range(size)]
+        # Representación compacta: un entero por jugador (bit fila*size+col)
+        self.bits = [0, 0, 0]
+        # Hash Zobrist de la posición, actualizado en cada jugada
+        self.hash = 0
+        # Pila de jugadas (índice, jugador, uniones) para poder deshacerlas
+        self.history = []
+        # Casillas vacías: las primeras empty_count de `empty` (en cualquier orden);
+        # empty_position[k] es la posición de la casilla k mientras está vacía
+        cells = size * size
+        self.empty = list(range(cells))
+        self.empty_position = list(range(cells))
+        self.empty_count = cells
+        self.stones = 0
+        
+        # Conjuntos disjuntos con 4 nodos virtuales de borde (sin compresión
+        # de caminos para poder deshacer las uniones)
+        nodes = size * size + 4
+        self.parent = list(range(nodes))
+        self.set_size = [1] * nodes
+        self.unions = []
         
         # Códigos de color ANSI
         self.RED = '\033[91m'
@@ -11,76 +41,156 @@ class HexBoard:
 
     def clone(self) -> 'HexBoard':
         """Devuelve una copia exacta del tablero"""
-        new_board = HexBoard(self.size)
-        new_board.board = [row.copy() for row in self.board]
+        new_board = HexBoard(self.size, self.use_numpy)
+        if self.use_numpy:
+            new_board.board = self.board.copy()
+        else:
+            new_board.board = [row.copy() for row in self.board]
+        new_board.bits = self.bits.copy()  # El historial no se copia
+        new_board.hash = self.hash
+        new_board.empty = self.empty.copy()
+        new_board.empty_position = self.empty_position.copy()
+        new_board.empty_count = self.empty_count
+        new_board.stones = self.stones
+        new_board.parent = self.parent.copy()
+        new_board.set_size = self.set_size.copy()
         return new_board
 
+    def __getstate__(self) -> dict:
+        # La geometría es compartida: no se copia al enviar el tablero a otro proceso
+        state = self.__dict__.copy()
+        del state['geometry']
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.geometry = get_geometry(self.size)
+
     def place_piece(self, row: int, col: int, player_id: int) -> bool:
         """Coloca una ficha si la posición es válida"""
         if not (0 <= row < self.size and 0 <= col < self.size):
             raise ValueError("Posición fuera del tablero")
         if self.board[row][col] == 0:
-            self.board[row][col] = player_id
+            self.play(row, col, player_id)
             return True
         return False
 
+    def play(self, row: int, col: int, player_id: int):
+        """Coloca una ficha en el sitio sin validar (la casilla debe estar vacía)"""
+        index = row * self.size + col
+        self.board[row][col] = player_id
+        self.bits[player_id] |= 1 << index
+        self.hash ^= self.geometry.zobrist[player_id][index]
+        
+        # Sacar la casilla de las vacías intercambiándola con la última
+        empty, position = self.empty, self.empty_position
+        last = self.empty_count - 1
+        moved = empty[last]
+        slot = position[index]
+        empty[slot], empty[last] = moved, index
+        position[moved], position[index] = slot, last
+        self.empty_count = last
+        self.stones += 1
+        
+        # Unir con los vecinos del mismo jugador y con sus bordes
+        own = self.bits[player_id]
+        merged = 0
+        for other in self.geometry.neighbors[index]:
+            if (own >> other) & 1:
+                merged += self._union(index, other)
+        for node in self.geometry.edge_nodes[player_id][index]:
+            merged += self._union(index, node)
+        self.history.append((index, player_id, merged))
+
+    def undo(self):
+        """Deshace la última jugada hecha con play/place_piece"""
+        index, player_id, merged = self.history.pop()
+        for _ in range(merged):
+            child, root = self.unions.pop()
+            self.parent[child] = child
+            self.set_size[root] -= self.set_size[child]
+        row, col = divmod(index, self.size)
+        self.board[row][col] = 0
+        self.bits[player_id] ^= 1 << index
+        self.hash ^= self.geometry.zobrist[player_id][index]
+        # Deshacer en orden inverso: la casilla sigue justo tras las vacías
+        self.empty_count += 1
+        self.stones -= 1
+
+    def _find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            node = parent[node]
+        return node
+
+    def _union(self, a: int, b: int) -> int:
+        """Une dos conjuntos por tamaño; devuelve 1 si hubo unión"""
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return 0
+        if self.set_size[a] > self.set_size[b]:
+            a, b = b, a
+        self.parent[a] = b
+        self.set_size[b] += self.set_size[a]
+        self.unions.append((a, b))
+        return 1
+
+    def stone_mask(self, player_id: int) -> np.ndarray:
+        """Máscara 0/1 (size, size) de las fichas del jugador, a partir de sus bits"""
+        cells = self.size * self.size
+        raw = np.frombuffer(self.bits[player_id].to_bytes((cells + 7) // 8, 'little'), dtype=np.uint8)
+        return np.unpackbits(raw, count=cells, bitorder='little').reshape(self.size, self.size)
+
     def get_possible_moves(self) -> list:
-        """Devuelve todas las casillas vacías"""
-        return [(i, j) for i in range(self.size) 
-                       for j in range(self.size) 
-                       if self.board[i][j] == 0]
+        """Devuelve todas las casillas vacías (por filas)"""
+        coords = self.geometry.coords
+        return [coords[k] for k in sorted(self.empty[:self.empty_count])]
+
+    def empty_cells(self) -> list:
+        """Índices fila*size+col de las casillas vacías, sin orden (sin recorrer el tablero)"""
+        return self.empty[:self.empty_count]
 
     def check_connection(self, player_id: int) -> bool:
-        """Verifica si el jugador conectó sus lados (BFS)"""
-        visited = [[False for _ in range(self.size)] for _ in range(self.size)]
-        queue = []
-        
-        # Inicializar BFS según el jugador
+        """Verifica si el jugador conectó sus lados (conjuntos disjuntos)"""
+        edge = self.size * self.size
         if player_id == 1:  # Conectar izquierda (col=0) a derecha (col=size-1)
-            for i in range(self.size):
-                if self.board[i][0] == player_id:
-                    queue.append((i, 0))
-                    visited[i][0] = True
-        else:  # Conectar arriba (fila=0) a abajo (fila=size-1)
-            for j in range(self.size):
-                if self.board[0][j] == player_id:
-                    queue.append((0, j))
-                    visited[0][j] = True
-        
-        # Búsqueda de conexión con adyacencias even-r
-        while queue:
-            row, col = queue.pop(0)
-            
-            # Condición de victoria
-            if (player_id == 1 and col == self.size - 1) or (player_id == 2 and row == self.size - 1):
-                return True
-            
-            # Explorar vecinos
-            for r, c in self.get_adjacent_hexes(row, col):
-                if 0 <= r < self.size and 0 <= c < self.size:
-                    if not visited[r][c] and self.board[r][c] == player_id:
-                        visited[r][c] = True
-                        queue.append((r, c))
+            return self._find(edge) == self._find(edge + 1)
+        # Conectar arriba (fila=0) a abajo (fila=size-1)
+        return self._find(edge + 2) == self._find(edge + 3)
+
+    def winning_moves(self, player_id: int) -> set:
+        """Casillas vacías que conectan al jugador en una sola jugada"""
+        cells = self.size * self.size
+        start = cells if player_id == 1 else cells + 2
+        start_root, end_root = self._find(start), self._find(start + 1)
+        if start_root == end_root:
+            return set()
         
-        return False
+        # Una casilla gana si toca el grupo del borde inicial y el del final
+        neighbors = self.geometry.neighbors
+        edge_nodes = self.geometry.edge_nodes[player_id]
+        coords = self.geometry.coords
+        own = self.bits[player_id]
+        roots = {}
+        wins = set()
+        for index in self.empty_cells():
+            touched = {self._find(node) for node in edge_nodes[index]}
+            for other in neighbors[index]:
+                if (own >> other) & 1:
+                    if other not in roots:
+                        roots[other] = self._find(other)
+                    touched.add(roots[other])
+            if start_root in touched and end_root in touched:
+                wins.add(coords[index])
+        return wins
+
+    def find_forced_moves(self, player_id: int) -> tuple:
+        """Devuelve (victorias inmediatas del jugador, victorias inmediatas del rival)"""
+        return self.winning_moves(player_id), self.winning_moves(3 - player_id)
 
     def get_adjacent_hexes(self, row: int, col: int) -> list:
         """Devuelve las casillas adyacentes según even-r"""
-        if row % 2 == 0:  # Fila par
-            directions = [
-                (0, -1), (0, 1),    # Izquierda, derecha
-                (-1, 0), (1, 0),    # Arriba, abajo
-                (-1, 1), (1, 1)     # Arriba-derecha, abajo-derecha
-            ]
-        else:  # Fila impar
-            directions = [
-                (0, -1), (0, 1),    # Izquierda, derecha
-                (-1, 0), (1, 0),    # Arriba, abajo
-                (-1, -1), (1, -1)   # Arriba-izquierda, abajo-izquierda
-            ]
-        
-        return [(row + dr, col + dc) for dr, dc in directions 
-                if 0 <= row + dr < self.size and 0 <= col + dc < self.size]
+        return list(self.geometry.adjacent(row, col))
 
     def print_board(self):
         """Imprime el tablero con colores y formato even-r"""
@@ -105,4 +215,30 @@ class HexBoard:
                     row_str += f"{self.BLUE} B {self.RESET}"
                 else:
                     row_str += f"{self.GRAY} • {self.RESET}"
-            print(row_str)
\ No newline at end of file
+            print(row_str)
+
+
+def random_position(size: int, stones: int, rng: random.Random, finished: bool = False) -> HexBoard:
+    """Tablero con hasta `stones` fichas en casillas al azar (pruebas y benchmarks)
+
+    Los colores alternan empezando por el jugador 1 y se saltan las casillas
+    que completarían una conexión, así que mueve quien tenga menos fichas. Con
+    `finished` cada ficha es de un color al azar y puede haber conexiones.
+    """
+    board = HexBoard(size)
+    cells = [(row, col) for row in range(size) for col in range(size)]
+    rng.shuffle(cells)
+    placed = 0
+    for row, col in cells:
+        if placed == stones:
+            break
+        if finished:
+            board.play(row, col, rng.choice((1, 2)))
+            placed += 1
+            continue
+        board.play(row, col, 1 + placed % 2)
+        if board.check_connection(1) or board.check_connection(2):
+            board.undo()
+        else:
+            placed += 1
+    return board
@@ -0,0 +1,189 @@
+import math
+from collections import OrderedDict
+import numpy as np
+from board import HexBoard
+from geometry import get_geometry
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.linalg import spsolve
+except ImportError:  # Sin SciPy se resuelve con un sistema denso de NumPy
+    csr_matrix = spsolve = None
+
+class Evaluator:
+    """Interfaz común de evaluación de hojas para HexPlayer y AIPlayer"""
+
+    def evaluate(self, board: HexBoard, player_id: int) -> float:
+        """Valor de una posición no terminal desde el punto de vista de player_id"""
+        raise NotImplementedError("¡Implementa este método!")
+
+class IncrementalEvaluator:
+    """Evaluación de HexPlayer con sumas parciales que se actualizan por casilla"""
+
+    def __init__(self, player):
+        self.player_id = player.player_id
+        self.opponent_id = player.opponent_id
+        self.max_moves = player.max_moves
+        # Pesos por casilla (índice plano): borde, puentes, área y centro
+        self.weights = list(zip(
+            player.edge_weights.ravel().tolist(),
+            player.bridge_bonus.ravel().tolist(),
+            player.opponent_penalty.ravel().tolist(),
+            player.center_weights.ravel().tolist(),
+        ))
+        self.board = None
+
+    def reset(self, board: HexBoard):
+        """Calcula los totales desde cero (una vez por tablero de trabajo)"""
+        self.board = board
+        self.totals = {1: [0.0] * 4, 2: [0.0] * 4}
+        for player_id in (1, 2):
+            bits = self.board.bits[player_id]
+            totals = self.totals[player_id]
+            for index, weights in enumerate(self.weights):
+                if (bits >> index) & 1:
+                    for k in range(4):
+                        totals[k] += weights[k]
+        self.stones = board.stones
+        # Jugadas del historial ya incluidas en los totales
+        self.applied = list(board.history)
+
+    def sync(self, board: HexBoard):
+        """Aplica o retira solo las jugadas que cambiaron desde la última llamada"""
+        if board is not self.board:
+            self.reset(board)
+            return
+        history = board.history
+        applied = self.applied
+        common = 0
+        limit = min(len(applied), len(history))
+        # Las entradas del historial son tuplas nuevas en cada jugada
+        while common < limit and applied[common] is history[common]:
+            common += 1
+        while len(applied) > common:
+            index, player_id, _ = applied.pop()
+            self._update(index, player_id, -1.0)
+        for entry in history[common:]:
+            self._update(entry[0], entry[1], 1.0)
+            applied.append(entry)
+
+    def _update(self, index: int, player_id: int, sign: float):
+        totals = self.totals[player_id]
+        weights = self.weights[index]
+        totals[0] += sign * weights[0]
+        totals[1] += sign * weights[1]
+        totals[2] += sign * weights[2]
+        totals[3] += sign * weights[3]
+        self.stones += int(sign)
+
+    def evaluate(self, board: HexBoard) -> float:
+        """Mismo valor que simple_evaluate para posiciones no terminales, en O(1)"""
+        self.sync(board)
+        mine = self.totals[self.player_id]
+        theirs = self.totals[self.opponent_id]
+        game_phase = min(self.stones / self.max_moves, 1.0)
+
+        positional = mine[0] - theirs[0]
+        connections = mine[1] - theirs[1]
+        area = mine[2] - theirs[2]
+        center = (mine[3] - theirs[3]) * (1.0 - game_phase)
+        return positional * 0.6 + connections * 0.3 + area * 0.1 + center * 0.3
+
+
+# Estructura del circuito por (tamaño, jugador), compartida por todos los evaluadores
+_CIRCUITS = {}
+
+
+def _circuit(size: int, player_id: int) -> dict:
+    """Patrón disperso del laplaciano: pares de vecinos, bordes y orden CSR"""
+    key = (size, player_id)
+    if key not in _CIRCUITS:
+        geometry = get_geometry(size)
+        cells = geometry.cells
+        source = cells  # Nodo del borde inicial; el borde final es tierra
+        pairs = np.array([(u, v) for u in range(cells) for v in geometry.neighbors[u] if u < v],
+                         dtype=np.intp).reshape(-1, 2)
+        start_mask, end_mask = geometry.edge_masks[player_id]
+        starts = np.array([i for i in range(cells) if (start_mask >> i) & 1], dtype=np.intp)
+        ends = np.array([i for i in range(cells) if (end_mask >> i) & 1], dtype=np.intp)
+
+        # Entradas COO: diagonal, pares de vecinos y enlaces con la fuente
+        nodes = np.arange(cells + 1)
+        rows = np.concatenate([nodes, pairs[:, 0], pairs[:, 1], starts, np.full(len(starts), source)])
+        cols = np.concatenate([nodes, pairs[:, 1], pairs[:, 0], np.full(len(starts), source), starts])
+        order = np.lexsort((cols, rows))
+        indptr = np.searchsorted(rows[order], np.arange(cells + 2))
+        _CIRCUITS[key] = {
+            'nodes': cells + 1, 'pairs': pairs, 'starts': starts, 'ends': ends,
+            'order': order, 'indices': cols[order], 'indptr': indptr,
+            'rows': rows, 'cols': cols,
+        }
+    return _CIRCUITS[key]
+
+
+class ResistanceEvaluator(Evaluator):
+    """Heurística de resistencia: el tablero como circuito eléctrico entre bordes
+    
+    Cada casilla tiene resistencia 0 (casi) si es propia, 1 si está vacía e
+    infinita si es del rival; la conductancia entre vecinos es 1/(r_u + r_v).
+    Se resuelve el laplaciano disperso para la resistencia efectiva entre los
+    dos bordes de cada jugador y se devuelve log(R_rival / R_propia).
+    """
+
+    OWN_RESISTANCE = 1e-3
+    LEAK = 1e-6  # Fuga a tierra para que el sistema nunca sea singular
+
+    def __init__(self, cache_size: int = 200000):
+        # Resistencias ya resueltas por (hash, jugador), con expulsión LRU
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    def evaluate(self, board: HexBoard, player_id: int) -> float:
+        own = self.resistance(board, player_id)
+        opponent = self.resistance(board, 3 - player_id)
+        return math.log(opponent / own)
+
+    def resistance(self, board: HexBoard, player_id: int) -> float:
+        """Resistencia efectiva entre los bordes del jugador (cacheada por posición)"""
+        key = (board.hash, player_id)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        value = self._solve(board, player_id)
+        self.cache[key] = value
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return value
+
+    def _solve(self, board: HexBoard, player_id: int) -> float:
+        circuit = _circuit(board.size, player_id)
+        own = board.stone_mask(player_id).ravel().astype(bool)
+        opponent = board.stone_mask(3 - player_id).ravel().astype(bool)
+        resistance = np.where(own, self.OWN_RESISTANCE, np.where(opponent, np.inf, 1.0))
+
+        pairs, starts, ends = circuit['pairs'], circuit['starts'], circuit['ends']
+        conductance = 1.0 / (resistance[pairs[:, 0]] + resistance[pairs[:, 1]])
+        start_links = 1.0 / resistance[starts]
+        nodes = circuit['nodes']
+        cells = nodes - 1
+
+        diagonal = np.full(nodes, self.LEAK)
+        diagonal[:cells] += np.bincount(pairs[:, 0], conductance, cells)
+        diagonal[:cells] += np.bincount(pairs[:, 1], conductance, cells)
+        diagonal[starts] += start_links
+        diagonal[ends] += 1.0 / resistance[ends]
+        diagonal[cells] += start_links.sum()
+        data = np.concatenate([diagonal, -conductance, -conductance, -start_links, -start_links])
+
+        # Corriente unitaria en la fuente: la resistencia es su potencial
+        current = np.zeros(nodes)
+        current[cells] = 1.0
+        if csr_matrix is not None:
+            laplacian = csr_matrix((data[circuit['order']], circuit['indices'], circuit['indptr']),
+                                   shape=(nodes, nodes))
+            potential = spsolve(laplacian, current)
+        else:
+            laplacian = np.zeros((nodes, nodes))
+            laplacian[circuit['rows'], circuit['cols']] = data
+            potential = np.linalg.solve(laplacian, current)
+        return float(potential[cells])
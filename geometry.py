@@ -0,0 +1,166 @@
+import random
+import numpy as np
+
+# Direcciones de adyacencia even-r según la paridad de la fila
+EVEN_ROW_DIRECTIONS = [
+    (0, -1), (0, 1),    # Izquierda, derecha
+    (-1, 0), (1, 0),    # Arriba, abajo
+    (-1, 1), (1, 1)     # Arriba-derecha, abajo-derecha
+]
+ODD_ROW_DIRECTIONS = [
+    (0, -1), (0, 1),    # Izquierda, derecha
+    (-1, 0), (1, 0),    # Arriba, abajo
+    (-1, -1), (1, -1)   # Arriba-izquierda, abajo-izquierda
+]
+
+# Una sola geometría por tamaño, compartida por tableros y jugadores
+_GEOMETRIES = {}
+
+
+def get_geometry(size: int) -> 'BoardGeometry':
+    """Devuelve (creándola una vez) la geometría precalculada de un tamaño"""
+    geometry = _GEOMETRIES.get(size)
+    if geometry is None:
+        geometry = _GEOMETRIES[size] = BoardGeometry(size)
+    return geometry
+
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    array.setflags(write=False)
+    return array
+
+
+class BoardGeometry:
+    """Tablas que solo dependen del tamaño: vecinos, bordes, pesos y claves Zobrist"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.cells = size * size
+        self.coords = [divmod(index, size) for index in range(self.cells)]
+
+        # Vecinos en coordenadas e índices planos
+        self.adjacent_coords = []
+        for row, col in self.coords:
+            directions = EVEN_ROW_DIRECTIONS if row % 2 == 0 else ODD_ROW_DIRECTIONS
+            self.adjacent_coords.append(tuple((row + dr, col + dc) for dr, dc in directions
+                                              if 0 <= row + dr < size and 0 <= col + dc < size))
+        self.neighbors = [tuple(r * size + c for r, c in adjacent)
+                          for adjacent in self.adjacent_coords]
+        # Matriz (casillas, 6) rellenada con el índice centinela `cells`
+        self.neighbor_index = np.full((self.cells, 6), self.cells, dtype=np.intp)
+        for index, adjacent in enumerate(self.neighbors):
+            self.neighbor_index[index, :len(adjacent)] = adjacent
+        _read_only(self.neighbor_index)
+
+        # Nodos virtuales de borde: izquierda, derecha, arriba, abajo
+        left, right, top, bottom = range(self.cells, self.cells + 4)
+        self.edge_nodes = {1: [], 2: []}
+        for row, col in self.coords:
+            self.edge_nodes[1].append(tuple(node for node, on_edge in
+                                            ((left, col == 0), (right, col == size - 1)) if on_edge))
+            self.edge_nodes[2].append(tuple(node for node, on_edge in
+                                            ((top, row == 0), (bottom, row == size - 1)) if on_edge))
+
+        # Máscaras de bits de los bordes de cada jugador (inicio, destino)
+        left_mask = sum(1 << (row * size) for row in range(size))
+        right_mask = left_mask << (size - 1)
+        top_mask = (1 << size) - 1
+        bottom_mask = top_mask << (size * (size - 1))
+        self.edge_masks = {1: (left_mask, right_mask), 2: (top_mask, bottom_mask)}
+
+        # Claves Zobrist deterministas por jugador y casilla
+        rng = random.Random(size)
+        self.zobrist = [None] + [[rng.getrandbits(64) for _ in range(self.cells)]
+                                 for _ in range(2)]
+
+        # Puentes: pares de casillas no adyacentes con exactamente dos vecinos comunes
+        # (a, b, portador_1, portador_2) con a < b
+        self.bridges = []
+        for a in range(self.cells):
+            for b in {c for n in self.neighbors[a] for c in self.neighbors[n]}:
+                if b > a and b not in self.neighbors[a]:
+                    common = sorted(set(self.neighbors[a]) & set(self.neighbors[b]))
+                    if len(common) == 2:
+                        self.bridges.append((a, b, common[0], common[1]))
+
+        self._calculate_symmetries()
+        self._calculate_weights()
+
+    def _calculate_symmetries(self):
+        """Permutaciones de casillas que conservan la adyacencia y los bordes de cada jugador
+
+        Con even-r la simetría válida depende de la paridad del tamaño (volteo
+        vertical si es impar, giro de 180° si es par), así que cada candidata se
+        comprueba contra la tabla de vecinos en lugar de suponerla.
+        """
+        size = self.size
+        candidates = [
+            lambda row, col: (row, col),                        # Identidad
+            lambda row, col: (size - 1 - row, col),             # Volteo vertical
+            lambda row, col: (row, size - 1 - col),             # Volteo horizontal
+            lambda row, col: (size - 1 - row, size - 1 - col),  # Giro de 180°
+        ]
+        self.symmetries = []
+        for transform in candidates:
+            permutation = tuple(r * size + c for r, c in (transform(row, col) for row, col in self.coords))
+            if permutation not in self.symmetries and self._is_symmetry(permutation):
+                self.symmetries.append(permutation)
+
+    def _is_symmetry(self, permutation: tuple) -> bool:
+        for index, adjacent in enumerate(self.neighbors):
+            if {permutation[other] for other in adjacent} != set(self.neighbors[permutation[index]]):
+                return False
+        for start_mask, end_mask in self.edge_masks.values():
+            start = {permutation[i] for i in range(self.cells) if (start_mask >> i) & 1}
+            end = {permutation[i] for i in range(self.cells) if (end_mask >> i) & 1}
+            edges = {frozenset(i for i in range(self.cells) if (mask >> i) & 1)
+                     for mask in (start_mask, end_mask)}
+            if {frozenset(start), frozenset(end)} != edges:
+                return False
+        return True
+
+    def _calculate_weights(self):
+        size = self.size
+        x, y = np.mgrid[:size, :size]
+        #Bonificación por posiciones centrales
+        center = (size-1)/2
+        center_weights = 1 / (1 + np.sqrt((x - center)**2 + (y - center)**2))
+        center_weights /= np.max(center_weights)  #Ajustar peso
+        self.center_weights = _read_only(center_weights)
+
+        #Bonificación por extremos relevantes (jugador horizontal = 1)
+        self.edge_weights = {
+            1: _read_only(np.minimum(y + 1, size - y)),
+            2: _read_only(np.minimum(x + 1, size - x)),
+        }
+        self.target_edges = {
+            1: frozenset({(0, col) for col in range(size)} | {(size-1, col) for col in range(size)}),
+            2: frozenset({(row, 0) for row in range(size)} | {(row, size-1) for row in range(size)}),
+        }
+
+        # Bonificación por puentes
+        bridge_bonus = np.zeros((size, size))
+        bridge_bonus[:size-1, :size-1] = np.where((x + y)[:size-1, :size-1] % 2 == 0, 2, 1)
+        self.bridge_bonus = _read_only(bridge_bonus)
+
+        # Penalización por cercanía al oponente
+        self.opponent_penalty = _read_only(np.fromfunction(
+            lambda i, j: 1.5 - 0.5*np.abs(i - j)/size,
+            (size, size)
+        ))
+
+        # Parte estática del orden de jugadas de HexPlayer (mismo orden de sumas)
+        target_edge_bonus = 2.0
+        self.move_order_scores = {}
+        for player_id in (1, 2):
+            own_edge = (y == 0) | (y == size-1) if player_id == 1 else (x == 0) | (x == size-1)
+            target = (x == 0) | (x == size-1) if player_id == 1 else (y == 0) | (y == size-1)
+            scores = self.edge_weights[player_id] + self.center_weights
+            scores += np.where(own_edge, target_edge_bonus, 0.0)
+            scores += np.where(target, target_edge_bonus, 0.0)
+            scores += self.bridge_bonus * 0.8
+            self.move_order_scores[player_id] = _read_only(scores)
+
+    def adjacent(self, row: int, col: int) -> tuple:
+        """Devuelve las casillas adyacentes según even-r (tupla compartida)"""
+        return self.adjacent_coords[row * self.size + col]
@@ -0,0 +1,142 @@
+"""Libro de aperturas precalculado con claves canónicas por simetría
+
+Construcción (fuera de línea, por búsqueda profunda de HexPlayer):
+    python opening_book.py --sizes 7-19 --plies 4 --time 2.0 --out book.bin
+
+El archivo es una cabecera seguida de entradas (clave, tamaño, jugada)
+ordenadas por clave; OpeningBook lo abre con mmap, así que abrirlo es
+inmediato y varios procesos comparten las mismas páginas.
+"""
+import argparse
+import numpy as np
+from board import HexBoard
+from geometry import get_geometry
+from transposition import SIDE_TO_MOVE_KEY
+
+MAGIC = b'HEXBOOK1'
+HEADER_BYTES = 16  # MAGIC + número de entradas (uint64)
+ENTRY_DTYPE = np.dtype([('key', '<u8'), ('size', 'u1'), ('move', '<u2')])
+
+
+def canonical_key(board: HexBoard, player_id: int) -> tuple:
+    """(clave mínima entre las simetrías del tablero, permutación que la produce)
+
+    La clave es el hash Zobrist de la posición transformada, combinado con
+    SIDE_TO_MOVE_KEY cuando mueve el jugador 2.
+    """
+    geometry = get_geometry(board.size)
+    stones = []
+    for stone_player in (1, 2):
+        bits = board.bits[stone_player]
+        while bits:
+            low = bits & -bits
+            stones.append((low.bit_length() - 1, stone_player))
+            bits ^= low
+    best = None
+    for permutation in geometry.symmetries:
+        key = SIDE_TO_MOVE_KEY if player_id == 2 else 0
+        for index, stone_player in stones:
+            key ^= geometry.zobrist[stone_player][permutation[index]]
+        if best is None or key < best[0]:
+            best = (key, permutation)
+    return best
+
+
+def write_book(entries: dict, path: str):
+    """Escribe {(clave, tamaño): jugada canónica} ordenado por clave"""
+    table = np.zeros(len(entries), dtype=ENTRY_DTYPE)
+    for k, ((key, size), move) in enumerate(entries.items()):
+        table[k] = (key, size, move)
+    table = table[np.lexsort((table['size'], table['key']))]
+    with open(path, 'wb') as book_file:
+        book_file.write(MAGIC)
+        book_file.write(np.uint64(len(table)).tobytes())
+        book_file.write(table.tobytes())
+
+
+def build_book(sizes, plies: int = 4, branching: int = 3, time_per_position: float = 1.0,
+               verbose: bool = False) -> dict:
+    """Busca la mejor jugada de cada posición de las primeras `plies` jugadas
+
+    En cada posición se expanden la mejor jugada y las `branching` - 1 siguientes
+    según order_moves; las posiciones simétricas se buscan una sola vez.
+    """
+    # Importación local: player importa este módulo para consultar el libro
+    from player import HexPlayer
+    entries = {}
+    for size in sizes:
+        players = {1: HexPlayer(1), 2: HexPlayer(2)}
+        frontier = [HexBoard(size)]
+        for ply in range(plies):
+            mover = 1 if ply % 2 == 0 else 2
+            next_frontier = []
+            for board in frontier:
+                key, permutation = canonical_key(board, mover)
+                if (key, size) in entries:
+                    continue
+                move = players[mover].play(board, time_per_position)
+                players[mover].stop_pondering()
+                entries[(key, size)] = permutation[move[0] * size + move[1]]
+                if verbose:
+                    print(f"{size}x{size} ply {ply}: {move}")
+                if ply + 1 < plies:
+                    ordered = players[mover].order_moves(board.get_possible_moves(), board)
+                    candidates = [move] + [other for other in ordered if other != move][:branching - 1]
+                    for row, col in candidates:
+                        child = board.clone()
+                        child.play(row, col, mover)
+                        next_frontier.append(child)
+            frontier = next_frontier
+    return entries
+
+
+class OpeningBook:
+    """Consulta de solo lectura sobre un libro mapeado en memoria"""
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as book_file:
+            header = book_file.read(HEADER_BYTES)
+        if header[:8] != MAGIC:
+            raise ValueError(f"No es un libro de aperturas: {path}")
+        count = int(np.frombuffer(header[8:], dtype=np.uint64)[0])
+        self.path = path
+        self.entries = (np.memmap(path, dtype=ENTRY_DTYPE, mode='r', offset=HEADER_BYTES, shape=(count,))
+                        if count else np.zeros(0, dtype=ENTRY_DTYPE))
+        self.keys = self.entries['key']
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, board: HexBoard, player_id: int) -> tuple:
+        """Jugada del libro para `player_id` en esta posición, o None"""
+        key, permutation = canonical_key(board, player_id)
+        position = int(np.searchsorted(self.keys, np.uint64(key)))
+        while position < len(self.entries) and int(self.keys[position]) == key:
+            entry = self.entries[position]
+            if int(entry['size']) == board.size:
+                move = divmod(permutation.index(int(entry['move'])), board.size)
+                return move if board.board[move[0]][move[1]] == 0 else None
+            position += 1
+        return None
+
+
+def parse_sizes(text: str) -> list:
+    """'7-19' o '7,9,11'"""
+    sizes = []
+    for part in text.split(','):
+        first, _, last = part.partition('-')
+        sizes.extend(range(int(first), int(last or first) + 1))
+    return sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Construye un libro de aperturas para HexPlayer y AIPlayer")
+    parser.add_argument('--sizes', default='7-19')
+    parser.add_argument('--plies', type=int, default=4)
+    parser.add_argument('--branching', type=int, default=3)
+    parser.add_argument('--time', type=float, default=1.0, help="segundos de búsqueda por posición")
+    parser.add_argument('--out', default='opening_book.bin')
+    args = parser.parse_args()
+    book = build_book(parse_sizes(args.sizes), args.plies, args.branching, args.time, verbose=True)
+    write_book(book, args.out)
+    print(f"{len(book)} posiciones en {args.out}")
@@ -0,0 +1,372 @@
+"""Patrones de conexión sobre la adyacencia even-r de HexBoard
+
+- Puentes y plantillas de borde (II por la regla AND genérica, IIIa precalculada).
+- Región obligatoria: si el rival tiene una cadena de conexiones virtuales con
+  portadores disjuntos entre sus dos bordes, solo sirve jugar en su portador.
+- Casillas muertas: las que ningún jugador necesita para conectar.
+"""
+from collections import deque
+from board import HexBoard
+from geometry import get_geometry
+
+# Plantillas de borde por (tamaño, jugador)
+_TEMPLATES = {}
+# Portadores mayores no se comprueban (la búsqueda crece exponencialmente)
+MAX_TEMPLATE_CELLS = 14
+# Tamaño hasta el que template_shapes() busca; con más no aparecen formas nuevas
+SHAPES_MAX_SIZE = 19
+
+# Formas relativas de los candidatos que son plantilla: (paridad de la fila,
+# (fila, columna, distancia al borde) de cada casilla del portador respecto a
+# la casilla de la plantilla). Generado con template_shapes(): comprobarlas en
+# cada proceso costaba más de un segundo.
+TEMPLATE_SHAPES = frozenset({
+    (0, ((-4, -2, 0), (-3, -2, 0), (-3, -1, 1), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1),
+         (-1, 0, 2), (0, -2, 0), (0, -1, 1), (1, -2, 0), (1, -1, 1), (2, -2, 0))),
+    (0, ((-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 0, 2), (-1, 1, 1), (-1, 2, 0), (0, 1, 1),
+         (0, 2, 0), (1, 1, 1), (1, 2, 0))),
+    (0, ((-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 0, 2), (-1, 1, 1), (-1, 2, 0), (0, 1, 1),
+         (0, 2, 0), (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 0))),
+    (0, ((-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 0, 2), (-1, 1, 1), (-1, 2, 0), (0, 1, 1),
+         (0, 2, 0), (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 0), (3, 2, 0))),
+    (0, ((-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 1, 1), (-1, 2, 0), (0, 1, 1), (0, 2, 0),
+         (1, 0, 2), (1, 1, 1), (1, 2, 0))),
+    (0, ((-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 1, 1), (-1, 2, 0), (0, 1, 1), (0, 2, 0),
+         (1, 0, 2), (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 0))),
+    (0, ((-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 1, 1), (-1, 2, 0), (0, 1, 1), (0, 2, 0),
+         (1, 0, 2), (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 0), (3, 2, 0))),
+    (0, ((-2, -2, 0), (-2, -1, 0), (-2, 0, 0), (-2, 1, 0), (-1, -1, 1), (-1, 0, 1), (-1, 1, 1),
+         (0, -1, 2))),
+    (0, ((-2, -2, 0), (-1, -2, 0), (-1, -1, 1), (0, -2, 0), (0, -1, 1), (1, -2, 0), (1, -1, 1),
+         (1, 0, 2), (2, -2, 0), (2, -1, 1), (3, -2, 0), (3, -1, 1), (4, -2, 0))),
+    (0, ((-2, -1, 0), (-2, 0, 0), (-2, 1, 0), (-2, 2, 0), (-1, 0, 1), (-1, 1, 1), (-1, 2, 1),
+         (0, 1, 2))),
+    (0, ((-2, 1, 1), (-2, 2, 0), (-1, 0, 2), (-1, 1, 1), (-1, 2, 0), (0, 1, 1), (0, 2, 0),
+         (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 0), (3, 2, 0))),
+    (0, ((-2, 1, 1), (-2, 2, 0), (-1, 1, 1), (-1, 2, 0), (0, 1, 1), (0, 2, 0), (1, 0, 2),
+         (1, 1, 1), (1, 2, 0), (2, 1, 1), (2, 2, 0), (3, 2, 0))),
+    (0, ((0, -1, 2), (1, -1, 1), (1, 0, 1), (1, 1, 1), (2, -2, 0), (2, -1, 0), (2, 0, 0),
+         (2, 1, 0))),
+    (0, ((0, 1, 2), (1, 0, 1), (1, 1, 1), (1, 2, 1), (2, -1, 0), (2, 0, 0), (2, 1, 0),
+         (2, 2, 0))),
+    (1, ((-4, 2, 0), (-3, 1, 1), (-3, 2, 0), (-2, 1, 1), (-2, 2, 0), (-1, 0, 2), (-1, 1, 1),
+         (-1, 2, 0), (0, 1, 1), (0, 2, 0), (1, 1, 1), (1, 2, 0), (2, 2, 0))),
+    (1, ((-3, -2, 0), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1), (-1, 0, 2), (0, -2, 0),
+         (0, -1, 1), (1, -2, 0), (1, -1, 1))),
+    (1, ((-3, -2, 0), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1), (-1, 0, 2), (0, -2, 0),
+         (0, -1, 1), (1, -2, 0), (1, -1, 1), (2, -2, 0), (2, -1, 1))),
+    (1, ((-3, -2, 0), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1), (-1, 0, 2), (0, -2, 0),
+         (0, -1, 1), (1, -2, 0), (1, -1, 1), (2, -2, 0), (2, -1, 1), (3, -2, 0))),
+    (1, ((-3, -2, 0), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1), (0, -2, 0), (0, -1, 1),
+         (1, -2, 0), (1, -1, 1), (1, 0, 2))),
+    (1, ((-3, -2, 0), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1), (0, -2, 0), (0, -1, 1),
+         (1, -2, 0), (1, -1, 1), (1, 0, 2), (2, -2, 0), (2, -1, 1))),
+    (1, ((-3, -2, 0), (-2, -2, 0), (-2, -1, 1), (-1, -2, 0), (-1, -1, 1), (0, -2, 0), (0, -1, 1),
+         (1, -2, 0), (1, -1, 1), (1, 0, 2), (2, -2, 0), (2, -1, 1), (3, -2, 0))),
+    (1, ((-2, 2, 0), (-1, 1, 1), (-1, 2, 0), (0, 1, 1), (0, 2, 0), (1, 0, 2), (1, 1, 1),
+         (1, 2, 0), (2, 1, 1), (2, 2, 0), (3, 1, 1), (3, 2, 0), (4, 2, 0))),
+    (1, ((-1, -2, 0), (-1, -1, 1), (-1, 0, 2), (0, -2, 0), (0, -1, 1), (1, -2, 0), (1, -1, 1),
+         (2, -2, 0), (2, -1, 1), (3, -2, 0))),
+    (1, ((-1, -2, 0), (-1, -1, 1), (0, -2, 0), (0, -1, 1), (1, -2, 0), (1, -1, 1), (1, 0, 2),
+         (2, -2, 0), (2, -1, 1), (3, -2, 0))),
+    (1, ((0, -1, 2), (1, -2, 1), (1, -1, 1), (1, 0, 1), (2, -2, 0), (2, -1, 0), (2, 0, 0),
+         (2, 1, 0))),
+    (1, ((0, 1, 2), (1, -1, 1), (1, 0, 1), (1, 1, 1), (2, -1, 0), (2, 0, 0), (2, 1, 0),
+         (2, 2, 0))),
+})
+
+
+def bridges(board: HexBoard, player_id: int) -> list:
+    """Puentes propios con los dos portadores vacíos: (a, b, (portador_1, portador_2))"""
+    own = board.bits[player_id]
+    occupied = board.bits[1] | board.bits[2]
+    result = []
+    for a, b, first, second in board.geometry.bridges:
+        if (own >> a) & 1 and (own >> b) & 1 and not ((occupied >> first) & 1 or (occupied >> second) & 1):
+            if board._find(a) != board._find(b):
+                result.append((a, b, (first, second)))
+    return result
+
+
+def bridge_intrusions(board: HexBoard, player_id: int) -> set:
+    """Portadores vacíos de puentes propios cuyo otro portador ya ocupó el rival
+
+    Jugar ahí es la respuesta que mantiene la conexión.
+    """
+    own = board.bits[player_id]
+    theirs = board.bits[3 - player_id]
+    occupied = own | theirs
+    result = set()
+    for a, b, first, second in board.geometry.bridges:
+        if (own >> a) & 1 and (own >> b) & 1 and board._find(a) != board._find(b):
+            if (theirs >> first) & 1 and not (occupied >> second) & 1:
+                result.add(second)
+            elif (theirs >> second) & 1 and not (occupied >> first) & 1:
+                result.add(first)
+    return result
+
+
+def edge_templates(size: int, player_id: int) -> list:
+    """Plantillas IIIa (zigurat) hacia cada borde del jugador: (casilla, lado, portador)
+
+    `lado` es 0 para el borde inicial y 1 para el final. Para una casilla a
+    distancia 2 del borde y una vecina suya a la misma distancia, el candidato
+    es esa vecina, las casillas de distancia 1 junto a ambas y las del borde
+    junto a estas; si no basta, se prueba con la fila intermedia ampliada. Como
+    los bordes izquierdo y derecho son en zigzag con even-r, solo se aceptan
+    los candidatos cuya forma está en TEMPLATE_SHAPES.
+    """
+    key = (size, player_id)
+    if key not in _TEMPLATES:
+        _TEMPLATES[key] = _find_templates(size, player_id, lambda shape, *candidate: shape in TEMPLATE_SHAPES)
+    return _TEMPLATES[key]
+
+
+def warm_up(sizes=range(1, SHAPES_MAX_SIZE + 1)):
+    """Calcula de antemano las plantillas de cada tamaño (unos milisegundos en total)"""
+    for size in sizes:
+        for player_id in (1, 2):
+            edge_templates(size, player_id)
+
+
+def template_shapes(max_size: int = SHAPES_MAX_SIZE) -> frozenset:
+    """Formas de candidato que son conexión virtual, comprobadas por búsqueda (lento)
+
+    Sirve para regenerar TEMPLATE_SHAPES.
+    """
+    verdicts = {}
+
+    def verify(shape, geometry, distance, cell, carrier):
+        if shape not in verdicts:
+            verdicts[shape] = (len(carrier) <= MAX_TEMPLATE_CELLS
+                               and _is_template(geometry, distance, cell, carrier))
+        return verdicts[shape]
+
+    for size in range(1, max_size + 1):
+        for player_id in (1, 2):
+            _find_templates(size, player_id, verify)
+    return frozenset(shape for shape, accepted in verdicts.items() if accepted)
+
+
+def _find_templates(size: int, player_id: int, accept) -> list:
+    """Primer candidato aceptado por `accept(forma, geometría, distancias, casilla, portador)`
+    para cada casilla a distancia 2 y cada vecina suya a la misma distancia"""
+    geometry = get_geometry(size)
+    templates = []
+    for side, mask in enumerate(geometry.edge_masks[player_id]):
+        distance = _edge_distances(geometry, mask)
+        for cell in range(geometry.cells):
+            if distance[cell] != 2:
+                continue
+            row, col = geometry.coords[cell]
+            for partner in geometry.neighbors[cell]:
+                if distance[partner] != 2:
+                    continue
+                for wide in (False, True):
+                    carrier = _zigurat(geometry, distance, cell, partner, wide)
+                    shape = (row % 2, tuple((geometry.coords[index][0] - row, geometry.coords[index][1] - col,
+                                             distance[index]) for index in carrier))
+                    if accept(shape, geometry, distance, cell, carrier):
+                        templates.append((cell, side, carrier))
+                        break
+    return templates
+
+
+def _edge_distances(geometry, mask: int) -> list:
+    """Distancia en casillas hasta la fila de borde (0 en el propio borde)"""
+    distance = [None] * geometry.cells
+    queue = deque()
+    for index in range(geometry.cells):
+        if (mask >> index) & 1:
+            distance[index] = 0
+            queue.append(index)
+    while queue:
+        index = queue.popleft()
+        for other in geometry.neighbors[index]:
+            if distance[other] is None:
+                distance[other] = distance[index] + 1
+                queue.append(other)
+    return distance
+
+
+def _zigurat(geometry, distance: list, cell: int, partner: int, wide: bool) -> tuple:
+    """Portador candidato: la vecina, sus casillas de distancia 1 y el borde bajo ellas
+
+    Con `wide` la fila de distancia 1 se amplía con sus vecinas de la misma
+    distancia (necesario en los bordes en zigzag).
+    """
+    middle = {other for index in (cell, partner) for other in geometry.neighbors[index] if distance[other] == 1}
+    if wide:
+        middle |= {other for index in middle for other in geometry.neighbors[index] if distance[other] == 1}
+    edge = {other for index in middle for other in geometry.neighbors[index] if distance[other] == 0}
+    return tuple(sorted({partner} | middle | edge))
+
+
+def _is_template(geometry, distance: list, cell: int, carrier: tuple) -> bool:
+    """Comprueba el candidato con bits locales: la casilla de la plantilla es el bit len(carrier)"""
+    size = len(carrier)
+    position = {index: k for k, index in enumerate(carrier)}
+    position[cell] = size
+    adjacent = [sum(1 << position[other] for other in geometry.neighbors[index] if other in position)
+                for index in carrier + (cell,)]
+    on_edge = sum(1 << k for k, index in enumerate(carrier) if distance[index] == 0)
+    return _is_connection(adjacent, on_edge, size, (1 << size) - 1)
+
+
+def _is_connection(adjacent: list, on_edge: int, cell: int, carrier: int) -> bool:
+    """¿Conecta el bit `cell` con el borde aunque el rival empiece a jugar en el portador?"""
+    memo = {}
+
+    def connected(own: int) -> bool:
+        reached = frontier = 1 << cell
+        while frontier:
+            grown = 0
+            bits = frontier
+            while bits:
+                low = bits & -bits
+                grown |= adjacent[low.bit_length() - 1]
+                bits ^= low
+            frontier = grown & own & ~reached
+            reached |= frontier
+            if reached & on_edge:
+                return True
+        return False
+
+    def wins(own: int, theirs: int) -> bool:
+        key = (own, theirs)
+        if key not in memo:
+            empty = carrier & ~own & ~theirs
+            if connected(own):
+                memo[key] = True
+            elif not connected(own | empty):
+                # Ni ocupando todo lo libre conecta
+                memo[key] = False
+            else:
+                cells = [k for k in range(cell) if (empty >> k) & 1]
+                # Primero las respuestas junto a la intrusión (como al defender un puente)
+                memo[key] = all(any(wins(own | (1 << reply), theirs | (1 << intrusion))
+                                    for reply in sorted(cells, key=lambda k: not (adjacent[intrusion] >> k) & 1)
+                                    if reply != intrusion)
+                                for intrusion in cells)
+        return memo[key]
+
+    return wins(0, 0)
+
+
+def virtual_chain(board: HexBoard, player_id: int) -> frozenset:
+    """Portador de una cadena de conexiones virtuales entre los bordes del jugador, o None
+
+    Los eslabones son grupos propios (raíces de la unión-búsqueda, con los
+    nodos de borde) unidos por dos casillas vacías comunes (puentes y plantilla
+    II) o por plantillas IIIa. Se busca en anchura un camino cuyos portadores
+    no se solapen.
+    """
+    geometry = board.geometry
+    cells = geometry.cells
+    own = board.bits[player_id]
+    occupied = board.bits[1] | board.bits[2]
+    start = cells if player_id == 1 else cells + 2
+    source, target = board._find(start), board._find(start + 1)
+    if source == target:
+        return frozenset()
+
+    # Casillas vacías comunes a cada par de grupos
+    common = {}
+    for index in sorted(board.empty_cells()):
+        groups = {board._find(node) for node in geometry.edge_nodes[player_id][index]}
+        groups.update(board._find(other) for other in geometry.neighbors[index] if (own >> other) & 1)
+        groups = sorted(groups)
+        for i, first in enumerate(groups):
+            for second in groups[i + 1:]:
+                common.setdefault((first, second), []).append(index)
+    links = {}
+    for (first, second), shared in common.items():
+        if len(shared) >= 2:
+            carrier = frozenset(shared[:2])
+            links.setdefault(first, []).append((second, carrier))
+            links.setdefault(second, []).append((first, carrier))
+    for cell, side, carrier in edge_templates(board.size, player_id):
+        if (own >> cell) & 1 and not any((occupied >> index) & 1 for index in carrier):
+            first, second = board._find(cell), board._find(start + side)
+            if first != second:
+                links.setdefault(first, []).append((second, frozenset(carrier)))
+                links.setdefault(second, []).append((first, frozenset(carrier)))
+
+    # Anchura desde el borde inicial acumulando el portador de cada camino
+    used = {source: frozenset()}
+    queue = deque([source])
+    while queue:
+        group = queue.popleft()
+        for other, carrier in links.get(group, ()):
+            if other in used or carrier & used[group]:
+                continue
+            used[other] = used[group] | carrier
+            if other == target:
+                return used[other]
+            queue.append(other)
+    return None
+
+
+def dead_cells(board: HexBoard) -> set:
+    """Casillas vacías que ningún jugador necesita (rellenarlas no cambia el resultado)
+
+    Una casilla es inútil para un jugador si cada par de sus vecinos
+    transitables (vacíos, propios o su borde) son adyacentes entre sí o ya
+    están en el mismo grupo: cualquier camino por ella puede rodearla. Incluye
+    las casillas encerradas por piedras de un solo color.
+    """
+    return {index for index in board.empty_cells()
+            if all(_useless(board, index, player_id) for player_id in (1, 2))}
+
+
+def _useless(board: HexBoard, index: int, player_id: int) -> bool:
+    geometry = board.geometry
+    theirs = board.bits[3 - player_id]
+    own = board.bits[player_id]
+    edge_nodes = geometry.edge_nodes[player_id]
+    # Vecinos transitables: casillas no rivales y nodos de borde del jugador
+    passable = [other for other in geometry.neighbors[index] if not (theirs >> other) & 1]
+    passable += list(edge_nodes[index])
+    for i, first in enumerate(passable):
+        for second in passable[i + 1:]:
+            if _touching(geometry, edge_nodes, first, second):
+                continue
+            if _stone_or_edge(own, geometry.cells, first) and _stone_or_edge(own, geometry.cells, second) \
+                    and board._find(first) == board._find(second):
+                continue
+            return False
+    return True
+
+
+def _touching(geometry, edge_nodes, first: int, second: int) -> bool:
+    """Adyacencia entre casillas o entre una casilla y un nodo de borde"""
+    cells = geometry.cells
+    if first >= cells and second >= cells:
+        return False
+    if first >= cells:
+        return first in edge_nodes[second]
+    if second >= cells:
+        return second in edge_nodes[first]
+    return second in geometry.neighbors[first]
+
+
+def _stone_or_edge(own: int, cells: int, node: int) -> bool:
+    return node >= cells or (own >> node) & 1
+
+
+def reduce_moves(board: HexBoard, player_id: int, moves: list) -> list:
+    """Jugadas que vale la pena considerar para player_id (nunca vacía si moves no lo es)
+
+    Se quitan las casillas muertas y, si el rival tiene una cadena virtual
+    entre sus bordes, solo quedan las de su portador.
+    """
+    size = board.size
+    dead = dead_cells(board)
+    chain = virtual_chain(board, 3 - player_id)
+    reduced = [move for move in moves if move[0] * size + move[1] not in dead
+               and (chain is None or move[0] * size + move[1] in chain)]
+    return reduced if reduced else moves
+
+
+# Las plantillas de los tamaños habituales quedan listas al importar, fuera del reloj
+warm_up()
@@ -1,7 +1,61 @@
 import math
 import numpy as np
+import pickle
+import random
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, wait
 from board import HexBoard
+from evaluation import Evaluator, IncrementalEvaluator
+from geometry import get_geometry
+from opening_book import OpeningBook
+from patterns import reduce_moves, warm_up
+from search_state import SearchState
+from search_stats import SearchStats
+from solver import EndgameSolver
+from time_manager import TimeManager
+from transposition import TranspositionTable, EXACT, LOWER, UPPER, SIDE_TO_MOVE_KEY
+
+# Jugadores reutilizados dentro de cada proceso del pool (por configuración y tamaño)
+_WORKER_PLAYERS = {}
+
+
+def _warm_up() -> bool:
+    warm_up()
+    return True
+
+
+def _search_root_moves(config: bytes, board: HexBoard, moves: list, deadline: float) -> tuple:
+    """Profundidad iterativa sobre un subconjunto de jugadas raíz (en un proceso del pool)
+
+    `config` son los argumentos de HexPlayer del proceso principal serializados
+    con pickle (HexPlayer.worker_config). Devuelve (nodos, cortes, resultados)
+    para que las estadísticas del proceso principal los sumen.
+    """
+    # Una tarea que empezó tarde (el proceso seguía con otra) no tiene nada que hacer
+    if time.monotonic() >= deadline:
+        return 0, 0, []
+    player = _WORKER_PLAYERS.get((config, board.size))
+    if player is None:
+        player = _WORKER_PLAYERS[(config, board.size)] = HexPlayer(**pickle.loads(config))
+        player.size = board.size
+        player.calculate_weights()
+    player.tt.clear()
+    player.state.reset()
+    player.cutoffs = 0
+    player.clock.start_deadline(deadline)
+    
+    # (profundidad, jugada, valor) por cada profundidad completada
+    results = []
+    max_depth = board.empty_count
+    try:
+        for depth in range(1, max_depth + 1):
+            move, value = player.alpha_beta_search(board, moves, depth)
+            results.append((depth, move, value))
+    except TimeoutError:
+        pass
+    return player.clock.nodes, player.cutoffs, results
+
 
 class Player:
     def __init__(self, player_id: int):
@@ -11,7 +65,23 @@ class Player:
         raise NotImplementedError("¡Implementa este método!")
     
 class HexPlayer(Player):
-    def __init__(self, player_id: int):
+    # Semiancho inicial de la ventana de aspiración alrededor del valor anterior
+    ASPIRATION_WINDOW = 1.0
+    # Ventana nula de PVS (los valores son flotantes)
+    NULL_WINDOW = 1e-9
+    # Peso máximo de la historia frente a la puntuación estática de order_moves
+    HISTORY_WEIGHT = 2.0
+    # Fracción del tiempo de la jugada que puede usar el resolvedor de finales
+    ENDGAME_SHARE = 0.5
+    # Profundidad restante mínima para podar con patrones (cerca de las hojas no compensa)
+    PATTERN_MIN_DEPTH = 3
+
+    def __init__(self, player_id: int, tt_size_mb: float = 16, tt_policy: str = 'depth',
+                 incremental_eval: bool = True, leaf_evaluator: Evaluator = None,
+                 workers: int = 1, ponder: bool = False, ponder_replies: int = 3,
+                 game_time: float = None, search_heuristics: bool = True,
+                 opening_book: str = None, endgame_threshold: int = 16,
+                 patterns: bool = True, on_stats=None):
         super().__init__(player_id)
         self.size = None
         self.edge_weights = None
@@ -21,64 +91,158 @@ class HexPlayer(Player):
         self.opponent_id = 2 if player_id == 1 else 1 
         self.center_weights = None
         self.max_moves = None 
-        
+        self.move_order_scores = None
+        # Estado que se conserva entre jugadas (historia, killers, variante principal)
+        self.state = None
+        # Killers, historia, PVS y ventanas de aspiración (False: alfa-beta simple)
+        self.search_heuristics = search_heuristics
+        # Tabla de transposición compartida entre profundidades y jugadas
+        self.tt = TranspositionTable(tt_size_mb, tt_policy)
+        self.incremental_eval = incremental_eval
+        self.evaluator = None
+        # Evaluador alternativo de hojas (p. ej. ResistanceEvaluator)
+        self.leaf_evaluator = leaf_evaluator
+        # Búsqueda paralela en la raíz con un pool de procesos persistente
+        self.workers = workers
+        self.pool = None
+        self.stale = []  # Tareas que no respondieron a tiempo y pueden ocupar procesos
+        # Argumentos con los que los procesos del pool construyen su jugador
+        self.worker_config = pickle.dumps({
+            'player_id': player_id, 'tt_size_mb': tt_size_mb, 'tt_policy': tt_policy,
+            'incremental_eval': incremental_eval, 'leaf_evaluator': leaf_evaluator,
+            'search_heuristics': search_heuristics, 'patterns': patterns, 'endgame_threshold': 0})
+        if workers > 1:
+            self.start_pool()
+        # Reflexión en el tiempo del oponente: {hash: (jugada, valor, profundidad)}
+        self.ponder = ponder
+        self.ponder_replies = ponder_replies
+        self.ponder_thread = None
+        self.pondered = {}
+        # Reparto del tiempo (por jugada o por partida) y parada de la búsqueda
+        self.clock = TimeManager(game_time)
+        # Libro de aperturas mapeado en memoria (ruta de opening_book.py)
+        self.book = OpeningBook(opening_book) if opening_book is not None else None
+        # Resolvedor exacto (DFPN) con a lo sumo endgame_threshold casillas vacías (0: nunca)
+        self.endgame_threshold = endgame_threshold
+        self.solver = EndgameSolver() if endgame_threshold > 0 else None
+        # Poda por casillas muertas y región obligatoria (patterns.py)
+        self.patterns = patterns
+        # Gancho opcional: recibe un SearchStats al final de cada play() (None: no se construye)
+        self.on_stats = on_stats
+        # Resultado de la última búsqueda (para las estadísticas)
+        self.move_source = None
+        self.completed_depth = 0
+        self.best_value = None
+        self.cutoffs = 0
 
     def play(self, board: HexBoard, time_limit: float) -> tuple:
+        # Detener la reflexión en segundo plano antes de usar las tablas compartidas
+        self.stop_pondering()
+        move = self.search(board, time_limit)
+        tt_probes, tt_hits = self.tt.probes, self.tt.hits
+        pv = []
+        if move is not None:
+            # Recordar la posición y la continuación esperada para la próxima llamada
+            pv = self.principal_variation(board, move)
+            self.state.finish(board, move, self.player_id, pv)
+        elapsed = self.clock.finish()
+        if self.on_stats is not None:
+            self.on_stats(SearchStats(
+                'HexPlayer', self.player_id, move, self.move_source, elapsed, self.clock.nodes,
+                self.completed_depth, self.best_value,
+                [(self.completed_depth - len(self.clock.iterations) + 1 + k, nodes, seconds)
+                 for k, (nodes, seconds) in enumerate(self.clock.iterations)],
+                self.cutoffs, tt_probes, tt_hits,
+                [move] + [divmod(index, self.size) for index in pv] if move is not None else []))
+        if self.ponder and move is not None and self.pool is None:
+            self.start_pondering(board, move)
+        return move
+
+    def search(self, board: HexBoard, time_limit: float) -> tuple:
         possible_moves = board.get_possible_moves()
-        time_limit=time_limit-0.15 #Ajustar tiempo por si acaso
+        self.move_source, self.completed_depth, self.best_value, self.cutoffs = 'search', 0, None, 0
         
         if not possible_moves: #Por si acaso(nunca debería entrar)
             return None
         
-        if self.size is None:
+        if self.size != board.size:
             self.size = board.size
             self.calculate_weights() #Calcular pesos iniciales de cada posición
             
-        # Verificar victoria inmediata
-        for move in possible_moves:
-            temp_board = board.clone()
-            temp_board.place_piece(move[0], move[1], self.player_id)
-            if temp_board.check_connection(self.player_id):
-                return move 
-
-        # Verificar si oponente puede ganar en siguiente turno
-        opponent_moves = []
-        for move in possible_moves:
-            temp_board = board.clone()
-            temp_board.place_piece(move[0], move[1], self.opponent_id)
-            if temp_board.check_connection(self.opponent_id):
-                opponent_moves.append(move)
-        
-        # Determinar los movimientos a considerar
-        if opponent_moves:
-            #Si el oponente puede ganar en el próximo movimiento priorizar bloqueo
-            possible_moves_block = opponent_moves
-        else:
-            possible_moves_block = possible_moves
+        # Jugadas del oponente desde la última llamada (None si empieza otra partida)
+        if self.state.sync(board) is None:
+            self.tt.clear()
+            self.clock.new_game()
+        self.tt.new_search()
+        self.clock.start(board, time_limit)
+        
+        if self.book is not None:
+            book_move = self.book.lookup(board, self.player_id)
+            if book_move is not None:
+                self.move_source = 'book'
+                return book_move
+            
+        # Copia de trabajo: la búsqueda juega y deshace jugadas sobre ella
+        board = board.clone()
+            
+        # Victorias inmediatas propias, jugadas de bloqueo obligadas y poda por patrones
+        winning_move, possible_moves_block = self.root_candidates(board, possible_moves)
+        if winning_move is not None:
+            self.move_source = 'forced'
+            return winning_move
+        
+        # Con pocas casillas vacías se intenta demostrar el resultado: una victoria
+        # demostrada se juega ya por la línea más corta; si no, se sigue buscando
+        if self.solver is not None and len(possible_moves) <= self.endgame_threshold:
+            budget = self.clock.soft_limit - self.clock.start_time
+            won, move = self.solver.solve(board, self.player_id,
+                                          self.clock.start_time + budget * self.ENDGAME_SHARE)
+            if won:
+                self.move_source = 'solver'
+                return move
         
         # Ordenar movimientos a explorar
         ordered_moves = self.order_moves(possible_moves_block, board)
         
         # Profundidad iterativa con manejo de tiempo
-        start_time = time.time()
-        abs_time_limit = start_time + time_limit
         best_move = ordered_moves[0]
         best_value = -math.inf
+        values = {}  # Valor de cada profundidad completada (guía la aspiración)
         depth = 1
         
+        # La variante principal de la jugada anterior propone la primera jugada
+        if self.state.pv and divmod(self.state.pv[0], self.size) in ordered_moves:
+            best_move = divmod(self.state.pv[0], self.size)
+        
+        # Si se reflexionó sobre esta posición se aprovechan sus resultados
+        pondered = self.pondered.get(board.hash)
+        if pondered is not None and pondered[0] in ordered_moves:
+            best_move, best_value, depth = pondered
+            values[depth] = best_value
+            self.completed_depth, self.best_value = depth, best_value
+            depth += 1
+        
+        if self.pool is not None and len(ordered_moves) > 1 and self.pool_idle():
+            self.move_source = 'parallel'
+            return self.parallel_search(board, ordered_moves)
+        
         try:
-            while True:
-                # Verificar tiempo antes de cada profundidad
-                if time.time() >= abs_time_limit:
-                    raise TimeoutError()
-                
-                current_move, current_value = self.alpha_beta_search(
-                    board, possible_moves_block, depth, abs_time_limit
+            # Solo se empieza una profundidad si se prevé que termine a tiempo
+            while depth <= len(possible_moves) and self.clock.can_start_iteration():
+                self.clock.begin_iteration()
+                # La evaluación oscila entre profundidades pares e impares:
+                # la ventana se centra en la última de la misma paridad
+                current_move, current_value = self.aspiration_search(
+                    board, possible_moves_block, depth, values.get(depth - 2, -math.inf)
                 )
+                self.clock.end_iteration()
+                values[depth] = current_value
+                self.completed_depth = depth
                 
                 if current_value > best_value:
                     best_move = current_move
                     best_value = current_value
+                    self.best_value = best_value
                 
                 depth += 1
         except TimeoutError:
@@ -86,23 +250,184 @@ class HexPlayer(Player):
         
         return best_move
 
-    def alpha_beta_search(self, board: HexBoard, possible_moves: list, depth: int, abs_time_limit: float) -> tuple:
+    def principal_variation(self, board: HexBoard, move: tuple) -> list:
+        """Continuación esperada tras `move` siguiendo las jugadas de la tabla de transposición"""
+        board = board.clone()
+        board.play(move[0], move[1], self.player_id)
+        pv = []
+        maximizing = False
+        while len(pv) < self.state.max_plies and not (
+                board.check_connection(self.player_id) or board.check_connection(self.opponent_id)):
+            entry = self.tt.probe(board.hash ^ SIDE_TO_MOVE_KEY if maximizing else board.hash)
+            if entry is None or entry[3] < 0:
+                break
+            row, col = divmod(entry[3], self.size)
+            if board.board[row][col] != 0:
+                break
+            board.play(row, col, self.player_id if maximizing else self.opponent_id)
+            pv.append(entry[3])
+            maximizing = not maximizing
+        return pv
+
+    def root_moves(self, board: HexBoard, possible_moves: list) -> tuple:
+        """Devuelve (victoria inmediata o None, jugadas a considerar en la raíz)"""
+        winning_moves, opponent_wins = board.find_forced_moves(self.player_id)
+        if winning_moves:
+            return min(winning_moves), []
+        
+        #Si el oponente puede ganar en el próximo movimiento priorizar bloqueo
+        if opponent_wins:
+            return None, sorted(opponent_wins)
+        return None, possible_moves
+
+    def root_candidates(self, board: HexBoard, possible_moves: list) -> tuple:
+        """root_moves y, con patrones, sin casillas muertas ni fuera del portador del rival
+
+        search y ponder_search la comparten para que la jugada reflexionada sea
+        siempre una de las que search consideraría.
+        """
+        winning_move, moves = self.root_moves(board, possible_moves)
+        if winning_move is None and self.patterns:
+            moves = reduce_moves(board, self.player_id, moves)
+        return winning_move, moves
+
+    def start_pondering(self, board: HexBoard, move: tuple):
+        """Sigue buscando en segundo plano las respuestas esperadas del oponente"""
+        board = board.clone()
+        board.play(move[0], move[1], self.player_id)
+        if board.check_connection(self.player_id):
+            return
+        self.pondered = {}
+        self.clock.start_infinite()
+        self.ponder_thread = threading.Thread(target=self.ponder_search, args=(board,), daemon=True)
+        self.ponder_thread.start()
+
+    def stop_pondering(self):
+        """Detiene la reflexión en segundo plano y espera a que termine"""
+        if self.ponder_thread is not None:
+            self.clock.stop()
+            self.ponder_thread.join()
+            self.ponder_thread = None
+
+    def ponder_search(self, board: HexBoard):
+        """Profundidad iterativa sobre las posiciones tras cada respuesta esperada"""
+        # Respuestas esperadas: la de la tabla de transposición y las mejor ordenadas
+        possible_replies = board.get_possible_moves()
+        replies = self.tt_move_first(self.order_moves(possible_replies, board),
+                                     self.tt.probe(board.hash))[:self.ponder_replies]
+        try:
+            for depth in range(1, len(possible_replies) + 1):
+                for reply in replies:
+                    board.play(reply[0], reply[1], self.opponent_id)
+                    try:
+                        winning_move, moves = self.root_candidates(board, board.get_possible_moves())
+                        if winning_move is None and moves and not board.check_connection(self.opponent_id):
+                            move, value = self.alpha_beta_search(board, moves, depth)
+                            self.pondered[board.hash] = (move, value, depth)
+                    finally:
+                        board.undo()
+        except TimeoutError:
+            pass
+
+    def start_pool(self):
+        """Arranca los procesos una sola vez para no pagar el arranque en cada jugada"""
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            for future in [self.pool.submit(_warm_up) for _ in range(self.workers)]:
+                future.result()
+
+    def close(self):
+        """Detiene el pool de procesos"""
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+            self.stale = []
+
+    def pool_idle(self) -> bool:
+        """¿Terminaron las tareas que no respondieron a tiempo en jugadas anteriores?
+
+        Paran a los pocos milisegundos de su plazo, así que se esperan como mucho
+        el margen del reloj; si siguen ocupadas se busca en este proceso en vez
+        de encolar las nuevas detrás de ellas.
+        """
+        if self.stale:
+            wait(self.stale, timeout=self.clock.margin)
+            self.stale = [future for future in self.stale if not future.done()]
+        return not self.stale
+
+    def parallel_search(self, board: HexBoard, ordered_moves: list) -> tuple:
+        """Reparte las jugadas raíz entre procesos y combina sus resultados de forma determinista"""
+        # Reparto alterno para que cada proceso reciba jugadas buenas y malas
+        chunks = [ordered_moves[k::self.workers] for k in range(min(self.workers, len(ordered_moves)))]
+        # El reloj monotónico es común a todos los procesos de la máquina
+        # Los procesos paran en el tiempo asignado a la jugada; el límite duro (menos un
+        # margen para devolver los resultados) solo acota la espera
+        deadline = min(self.clock.soft_limit, self.clock.hard_limit - 0.05)
+        futures = [self.pool.submit(_search_root_moves, self.worker_config, board, chunk, deadline)
+                   for chunk in chunks]
+        done, self.stale = wait(futures, timeout=max(0.0, self.clock.hard_limit - time.monotonic()))
+        results = []
+        for future in futures:
+            if future in done:
+                nodes, cutoffs, completed = future.result()
+                # Los nodos de los procesos cuentan en las estadísticas de la jugada
+                self.clock.nodes += nodes
+                self.cutoffs += cutoffs
+                if completed:
+                    results.append(completed)
+        if not results:
+            return ordered_moves[0]
+        
+        # Profundidad completada por todos los procesos que respondieron
+        depth = min(result[-1][0] for result in results)
+        candidates = [result[depth - 1] for result in results]
+        rank = {move: k for k, move in enumerate(ordered_moves)}
+        _, best_move, best_value = max(candidates, key=lambda c: (c[2], -rank[c[1]]))
+        self.completed_depth, self.best_value = depth, best_value
+        return best_move
+
+    def aspiration_search(self, board: HexBoard, possible_moves: list, depth: int, guess: float) -> tuple:
+        """Búsqueda raíz con una ventana estrecha alrededor de un valor previo (`guess`)
+        
+        Si el resultado cae fuera de la ventana se repite con ese lado abierto;
+        sin valor previo finito se busca con la ventana completa. Una victoria o
+        derrota demostrada (±inf) es exacta y no se repite.
+        """
+        if not self.search_heuristics or not math.isfinite(guess):
+            return self.alpha_beta_search(board, possible_moves, depth)
+        alpha = guess - self.ASPIRATION_WINDOW
+        beta = guess + self.ASPIRATION_WINDOW
+        while True:
+            move, value = self.alpha_beta_search(board, possible_moves, depth, alpha, beta)
+            if not math.isfinite(value) or (value <= alpha and alpha == -math.inf) \
+                    or (value >= beta and beta == math.inf):
+                return move, value
+            if value <= alpha:
+                alpha = -math.inf
+            elif value >= beta:
+                beta = math.inf
+            else:
+                return move, value
+
+    def alpha_beta_search(self, board: HexBoard, possible_moves: list, depth: int,
+                          alpha: float = -math.inf, beta: float = math.inf) -> tuple:
         best_move = possible_moves[0]
         best_value = -math.inf
-        alpha = -math.inf
-        beta = math.inf
+        alpha_orig = alpha
         
+        # La mejor jugada de la profundidad anterior se explora primero
+        key = board.hash ^ SIDE_TO_MOVE_KEY
         ordered_moves = self.order_moves(possible_moves, board)
+        ordered_moves = self.tt_move_first(ordered_moves, self.tt.probe(key))
         
         for move in ordered_moves:
-            if time.time() >= abs_time_limit:
-                raise TimeoutError()
+            self.clock.check()
             
-            new_board = board.clone()
-            new_board.place_piece(move[0], move[1], self.player_id)
-            value = self.minimax(
-                new_board, depth-1, alpha, beta, False, self.opponent_id, abs_time_limit
-            )
+            board.play(move[0], move[1], self.player_id)
+            try:
+                value = self.search_child(board, depth-1, alpha, beta, False, move is ordered_moves[0], 1)
+            finally:
+                board.undo()
             
             if value > best_value:
                 best_value = value
@@ -112,118 +437,175 @@ class HexPlayer(Player):
             if beta <= alpha:
                 break
         
+        if best_value <= alpha_orig:
+            flag = UPPER
+        elif best_value >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, best_value, best_move[0] * self.size + best_move[1])
         return best_move, best_value
+
+    def search_child(self, board: HexBoard, depth: int, alpha: float, beta: float,
+                     maximizing: bool, first: bool, ply: int) -> float:
+        """Valor de un hijo con PVS: ventana completa para el primero y nula para el resto
+        
+        `maximizing` indica a quién le toca en el hijo. La ventana nula solo
+        demuestra que la jugada no mejora la mejor; si la mejora se repite la
+        búsqueda con la ventana completa.
+        """
+        current_player = self.player_id if maximizing else self.opponent_id
+        if first or not self.search_heuristics:
+            return self.minimax(board, depth, alpha, beta, maximizing, current_player, ply)
+        if not maximizing and alpha > -math.inf:
+            # El padre maximiza: probar que el hijo no supera alpha
+            value = self.minimax(board, depth, alpha, alpha + self.NULL_WINDOW, maximizing, current_player, ply)
+        elif maximizing and beta < math.inf:
+            # El padre minimiza: probar que el hijo no baja de beta
+            value = self.minimax(board, depth, beta - self.NULL_WINDOW, beta, maximizing, current_player, ply)
+        else:
+            return self.minimax(board, depth, alpha, beta, maximizing, current_player, ply)
+        if alpha < value < beta:
+            value = self.minimax(board, depth, alpha, beta, maximizing, current_player, ply)
+        return value
     
-    def minimax(self, board: HexBoard, depth: int, alpha: float, beta: float, maximizing: bool, current_player: int, abs_time_limit: float) -> float:
-        if time.time() >= abs_time_limit:
-            raise TimeoutError()
+    def minimax(self, board: HexBoard, depth: int, alpha: float, beta: float, maximizing: bool, current_player: int, ply: int = 1) -> float:
+        self.clock.check()
         
         if depth == 0 or board.check_connection(self.player_id) or board.check_connection(self.opponent_id):
             return self.simple_evaluate(board)
         
+        # Consultar la tabla de transposición
+        key = board.hash ^ SIDE_TO_MOVE_KEY if maximizing else board.hash
+        entry = self.tt.probe(key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, tt_value, _ = entry
+            if flag == EXACT:
+                return tt_value
+            if flag == LOWER:
+                alpha = max(alpha, tt_value)
+            else:
+                beta = min(beta, tt_value)
+            if beta <= alpha:
+                return tt_value
+        alpha_orig, beta_orig = alpha, beta
+        
+        # Orden: jugada de la tabla, killers del ply y el resto por puntuación e historia
         possible_moves = board.get_possible_moves()
+        if self.patterns and depth >= self.PATTERN_MIN_DEPTH:
+            possible_moves = reduce_moves(board, current_player, possible_moves)
+        ordered_moves = self.order_moves(possible_moves, board)
+        if self.search_heuristics:
+            ordered_moves = self.killers_first(ordered_moves, ply)
+        ordered_moves = self.tt_move_first(ordered_moves, entry)
+        best_move = ordered_moves[0]
         
         if maximizing:
             value = -math.inf
-            ordered_moves = self.order_moves(possible_moves, board)
             for move in ordered_moves:
-                if time.time() >= abs_time_limit:
-                    raise TimeoutError()
-                
-                new_board = board.clone()
-                new_board.place_piece(move[0], move[1], self.player_id)
-                child_value = self.minimax(
-                    new_board, depth-1, alpha, beta, False, self.opponent_id, abs_time_limit
-                )
-                value = max(value, child_value)
+                board.play(move[0], move[1], self.player_id)
+                try:
+                    child_value = self.search_child(
+                        board, depth-1, alpha, beta, False, move is ordered_moves[0], ply+1
+                    )
+                finally:
+                    board.undo()
+                if child_value > value:
+                    value = child_value
+                    best_move = move
                 alpha = max(alpha, value)
                 if beta <= alpha:
                     break
-            return value
         else:
             value = math.inf
-            ordered_moves = self.order_moves(possible_moves, board)
             for move in ordered_moves:
-                if time.time() >= abs_time_limit:
-                    raise TimeoutError()
-                
-                new_board = board.clone()
-                new_board.place_piece(move[0], move[1], self.opponent_id)
-                child_value = self.minimax(
-                    new_board, depth-1, alpha, beta, True, self.player_id, abs_time_limit
-                )
-                value = min(value, child_value)
+                board.play(move[0], move[1], self.opponent_id)
+                try:
+                    child_value = self.search_child(
+                        board, depth-1, alpha, beta, True, move is ordered_moves[0], ply+1
+                    )
+                finally:
+                    board.undo()
+                if child_value < value:
+                    value = child_value
+                    best_move = move
                 beta = min(beta, value)
                 if beta <= alpha:
                     break
-            return value
+        
+        if beta <= alpha:
+            self.cutoffs += 1
+            if self.search_heuristics:
+                self.state.record_cutoff(best_move[0] * self.size + best_move[1], depth, ply)
+        
+        # Guardar el resultado con su tipo de cota
+        if value <= alpha_orig:
+            flag = UPPER
+        elif value >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, flag, value, best_move[0] * self.size + best_move[1])
+        return value
+
+    def killers_first(self, ordered_moves: list, ply: int) -> list:
+        """Adelanta las jugadas killer del ply que sigan siendo legales"""
+        for index in reversed(self.state.killer_moves(ply)):
+            killer = divmod(index, self.size)
+            if killer in ordered_moves:
+                ordered_moves.remove(killer)
+                ordered_moves.insert(0, killer)
+        return ordered_moves
+
+    def tt_move_first(self, ordered_moves: list, entry) -> list:
+        """Adelanta la jugada guardada en la tabla de transposición"""
+        if entry is None or entry[3] < 0:
+            return ordered_moves
+        tt_move = divmod(entry[3], self.size)
+        if tt_move in ordered_moves:
+            ordered_moves.remove(tt_move)
+            ordered_moves.insert(0, tt_move)
+        return ordered_moves
 
     def calculate_weights(self):
-        size = self.size
-        self.max_moves = size * size
-        x, y = np.mgrid[:size, :size]
-        #Bonificación por posiciones centrales
-        center = (size-1)/2
-        self.center_weights = 1 / (1 + np.sqrt((x - center)**2 + (y - center)**2))
-        self.center_weights /= np.max(self.center_weights)  #Ajustar peso
-        
-        #Bonificación por extremos relevantes
-        if self.is_horizontal_player:  
-            self.edge_weights = np.minimum(y + 1, size - y) 
-            self.target_edges = {(0, col) for col in range(size)} | {(size-1, col) for col in range(size)}
-        else: 
-            self.edge_weights = np.minimum(x + 1, size - x)  
-            self.target_edges = {(row, 0) for row in range(size)} | {(row, size-1) for row in range(size)}
-
-        # Bonificación por puentes 
-        self.bridge_bonus = np.zeros((size, size))
-        for i in range(size-1):
-            for j in range(size-1):
-                self.bridge_bonus[i,j] = 2 if (i + j) % 2 == 0 else 1
-
-        # Penalización por cercanía al oponente
-        self.opponent_penalty = np.fromfunction(
-            lambda i, j: 1.5 - 0.5*np.abs(i - j)/size, 
-            (size, size)
-        )
+        # Los pesos se comparten entre todos los jugadores del mismo tamaño
+        geometry = get_geometry(self.size)
+        self.max_moves = geometry.cells
+        self.center_weights = geometry.center_weights
+        key = 1 if self.is_horizontal_player else 2
+        self.edge_weights = geometry.edge_weights[key]
+        self.target_edges = geometry.target_edges[key]
+        self.bridge_bonus = geometry.bridge_bonus
+        self.opponent_penalty = geometry.opponent_penalty
+        self.move_order_scores = geometry.move_order_scores[self.player_id]
+        if self.incremental_eval:
+            self.evaluator = IncrementalEvaluator(self)
+        self.state = SearchState(self.size)
 
     def get_game_phase(self, board: HexBoard) -> float:
         #Estimar fase actual del juego(Escala de 0 a 1)
-        moves_made = self.max_moves - len(board.get_possible_moves())
-        return min(moves_made / self.max_moves, 1.0)
+        return min(board.stones / self.max_moves, 1.0)
 
     def order_moves(self, moves: list, board: HexBoard) -> list:
-        scores = []
-        target_edge_bonus = 2.0  
+        if not moves:
+            return []
+        size = self.size
         
-        for move in moves:
-            row, col = move
-            score = self.edge_weights[row, col]
-            score += self.center_weights[row, col]
-            
-            # Bonus extra si está en el borde inicial o final
-            if self.player_id == 1:  
-                if col == 0 or col == self.size-1:
-                    score += target_edge_bonus
-            else: 
-                if row == 0 or row == self.size-1:
-                    score += target_edge_bonus
-                    
-            if (row, col) in self.target_edges:
-                score += target_edge_bonus
-                    
-            score += self.bridge_bonus[row, col] * 0.8
-            
-            opponent_count = 0
-            for i in range(max(0, row-1), min(row+2, self.size)):
-                for j in range(max(0, col-1), min(col+2, self.size)):
-                    if board.board[i][j] == self.opponent_id: 
-                        opponent_count += 1
-            
-            score -= opponent_count * 0.6 * self.opponent_penalty[row, col]
-            scores.append(score)
+        # Fichas del oponente en la caja 3x3 de cada casilla (convolución separable)
+        opponent = np.zeros((size + 2, size + 2), dtype=np.uint8)
+        opponent[1:-1, 1:-1] = board.stone_mask(self.opponent_id)
+        rows = opponent[:-2] + opponent[1:-1] + opponent[2:]
+        opponent_count = rows[:, :-2] + rows[:, 1:-1] + rows[:, 2:]
         
-        return [moves[i] for i in np.argsort(-np.array(scores))]
+        # Puntuación estática precalculada menos la penalización por el oponente
+        scores = (self.move_order_scores - opponent_count * 0.6 * self.opponent_penalty).ravel()
+        if self.search_heuristics and self.state is not None:
+            # Historia de cortes normalizada a lo sumo HISTORY_WEIGHT puntos
+            max_history = self.state.history.max()
+            if max_history > 0:
+                scores = scores + self.HISTORY_WEIGHT * self.state.history / max_history
+        indices = np.array([row * size + col for row, col in moves])
+        return [moves[i] for i in np.argsort(-scores[indices]).tolist()]
 
     def simple_evaluate(self, board: HexBoard) -> float:
         #Si es un estado final determina si se gana o pierde y premia acorde
@@ -235,15 +617,23 @@ class HexPlayer(Player):
         if opp_conn and self.is_horizontal_player == (self.opponent_id == 1):
             return -math.inf
 
-        player_mask = (board.board == self.player_id)
-        opponent_mask = (board.board == self.opponent_id)
+        if self.leaf_evaluator is not None:
+            return self.leaf_evaluator.evaluate(board, self.player_id)
+
+        # Totales incrementales: O(1) por hoja
+        if self.evaluator is not None:
+            return self.evaluator.evaluate(board)
+
+        cells = np.asarray(board.board)
+        player_mask = (cells == self.player_id)
+        opponent_mask = (cells == self.opponent_id)
         
         game_phase = self.get_game_phase(board)
         
         #Pesos varian acorde a etapa de juego
         # Valor central
-        player_center = np.sum(self.center_weights * (np.array(board.board) == self.player_id)) * (1.0 - game_phase)
-        opponent_center = np.sum(self.center_weights * (np.array(board.board) == self.opponent_id)) * (1.0 - game_phase)
+        player_center = np.sum(self.center_weights * player_mask) * (1.0 - game_phase)
+        opponent_center = np.sum(self.center_weights * opponent_mask) * (1.0 - game_phase)
 
         # Valor posicional
         positional = np.sum(self.edge_weights * player_mask) - np.sum(self.edge_weights * opponent_mask)
@@ -266,4 +656,156 @@ class HexPlayer(Player):
     #     elif num_moves > 20:
     #         return 3
     #     else:
-    #         return 4
\ No newline at end of file
+    #         return 4
+
+class MCTSNode:
+    """Nodo del árbol de MCTS con estadísticas UCT y AMAF (RAVE)"""
+    __slots__ = ('move', 'player', 'parent', 'children', 'visits', 'wins',
+                 'amaf_visits', 'amaf_wins')
+
+    def __init__(self, move: int, player: int, parent: 'MCTSNode' = None):
+        self.move = move          # Índice plano de la jugada que lleva a este nodo
+        self.player = player      # Jugador que hizo esa jugada
+        self.parent = parent
+        self.children = None      # Se expanden todos a la vez en la primera visita
+        self.visits = 0
+        self.wins = 0
+        self.amaf_visits = 0
+        self.amaf_wins = 0
+
+
+class MCTSPlayer(Player):
+    """Jugador MCTS/UCT con RAVE y partidas aleatorias sobre un arreglo plano"""
+
+    def __init__(self, player_id: int, exploration: float = 0.25, rave_equivalence: float = 300,
+                 seed: int = None, game_time: float = None):
+        super().__init__(player_id)
+        self.opponent_id = 3 - player_id
+        self.exploration = exploration
+        self.rave_equivalence = rave_equivalence
+        self.rng = random.Random(seed)
+        self.clock = TimeManager(game_time)
+        
+        # Estadísticas de la última jugada
+        self.playouts = 0
+        self.playouts_per_second = 0.0
+
+    def play(self, board: HexBoard, time_limit: float) -> tuple:
+        possible_moves = board.get_possible_moves()
+        if not possible_moves: #Por si acaso(nunca debería entrar)
+            return None
+        if len(possible_moves) >= board.size * board.size - 1:
+            self.clock.new_game()
+        self.clock.start(board, time_limit)
+        self.playouts = 0
+        move = self.search(board, possible_moves)
+        # Todas las jugadas, también las forzadas, se descuentan del presupuesto
+        elapsed = self.clock.finish()
+        self.playouts_per_second = self.playouts / elapsed if elapsed > 0 else 0.0
+        return move
+
+    def search(self, board: HexBoard, possible_moves: list) -> tuple:
+        """Jugada forzada o la más visitada por MCTS hasta el tiempo asignado a la jugada"""
+        # Victorias inmediatas y bloqueos forzados
+        winning_moves, opponent_wins = board.find_forced_moves(self.player_id)
+        if winning_moves:
+            return min(winning_moves)
+        size = board.size
+        if opponent_wins:
+            candidates = [row * size + col for row, col in sorted(opponent_wins)]
+        else:
+            candidates = [row * size + col for row, col in possible_moves]
+        if len(candidates) == 1:
+            return divmod(candidates[0], size)
+        
+        geometry = get_geometry(size)
+        root_cells = [0] * geometry.cells
+        for player_id in (1, 2):
+            bits = board.bits[player_id]
+            for index in range(geometry.cells):
+                if (bits >> index) & 1:
+                    root_cells[index] = player_id
+        root = MCTSNode(None, self.opponent_id)
+        root.children = [MCTSNode(move, self.player_id, root) for move in candidates]
+        
+        # Arreglos preasignados para las partidas aleatorias
+        cells = [0] * geometry.cells
+        empties = [row * size + col for row, col in possible_moves]
+        
+        while True:
+            # Cada partida aleatoria es cara: se consulta el reloj en cada una y se
+            # para en el tiempo asignado (límite blando), no en el duro
+            if self.playouts > 0 and (self.clock.stop_requested or time.monotonic() >= self.clock.soft_limit):
+                break
+            cells[:] = root_cells
+            node = root
+            
+            # Selección y expansión: bajar por el árbol jugando sobre el arreglo
+            while node.children:
+                node = self._select(node)
+                cells[node.move] = node.player
+            if node.visits > 0 or node is root:
+                to_move = 3 - node.player
+                node.children = [MCTSNode(index, to_move, node) for index in empties if cells[index] == 0]
+                if node.children:
+                    node = self.rng.choice(node.children)
+                    cells[node.move] = node.player
+            
+            # Partida aleatoria: rellenar el tablero y comprobar el ganador una sola vez
+            self.rng.shuffle(empties)
+            to_move = 3 - node.player
+            for index in empties:
+                if cells[index] == 0:
+                    cells[index] = to_move
+                    to_move = 3 - to_move
+            winner = self._winner(cells, geometry)
+            
+            # Retropropagación con actualización AMAF de los hermanos
+            while node is not None:
+                node.visits += 1
+                if winner == node.player:
+                    node.wins += 1
+                parent = node.parent
+                if parent is not None:
+                    for child in parent.children:
+                        if cells[child.move] == child.player:
+                            child.amaf_visits += 1
+                            if winner == child.player:
+                                child.amaf_wins += 1
+                node = parent
+            self.playouts += 1
+        
+        best = max(root.children, key=lambda child: child.visits)
+        return divmod(best.move, size)
+
+    def _select(self, node: MCTSNode) -> MCTSNode:
+        """Elige el hijo con mejor mezcla UCT/RAVE"""
+        log_visits = math.log(node.visits + 1)
+        best, best_score = None, -math.inf
+        for child in node.children:
+            if child.visits == 0 and child.amaf_visits == 0:
+                return child
+            beta = math.sqrt(self.rave_equivalence / (3 * node.visits + self.rave_equivalence))
+            value = child.wins / child.visits if child.visits else 0.5
+            amaf = child.amaf_wins / child.amaf_visits if child.amaf_visits else 0.5
+            score = (1 - beta) * value + beta * amaf
+            score += self.exploration * math.sqrt(log_visits / (child.visits + 1))
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _winner(self, cells: list, geometry) -> int:
+        """Con el tablero lleno hay exactamente un ganador: basta comprobar al jugador 1"""
+        size = geometry.size
+        neighbors = geometry.neighbors
+        stack = [row * size for row in range(size) if cells[row * size] == 1]
+        seen = set(stack)
+        while stack:
+            index = stack.pop()
+            if index % size == size - 1:
+                return 1
+            for other in neighbors[index]:
+                if other not in seen and cells[other] == 1:
+                    seen.add(other)
+                    stack.append(other)
+        return 2
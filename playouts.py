@@ -0,0 +1,84 @@
+import numpy as np
+from board import HexBoard
+from evaluation import Evaluator
+from geometry import get_geometry
+
+class PlayoutStats:
+    """Resultado de un lote de partidas aleatorias desde una posición"""
+
+    def __init__(self, wins: np.ndarray, boards: np.ndarray, size: int):
+        self.playouts = len(wins)
+        # Proporción de partidas ganadas por cada jugador
+        self.win_rate = {1: float(wins.mean()), 2: float(1.0 - wins.mean())}
+        # Probabilidad de que cada casilla acabe siendo del jugador 1 / del jugador 2
+        self.ownership = {
+            1: (boards == 1).mean(axis=0).reshape(size, size),
+            2: (boards == 2).mean(axis=0).reshape(size, size),
+        }
+
+
+def batch_playouts(board: HexBoard, to_move: int, playouts: int = 1000,
+                   rng: np.random.Generator = None) -> PlayoutStats:
+    """Completa la posición al azar `playouts` veces a la vez como un arreglo (K, casillas)
+
+    Cada fila recibe una permutación aleatoria de las casillas vacías que se
+    reparten de forma alterna empezando por `to_move`. El ganador se obtiene con
+    una propagación de etiquetas vectorizada sobre todos los tableros: con el
+    tablero lleno, si el jugador 1 no conecta, gana el jugador 2.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    geometry = get_geometry(board.size)
+    cells = geometry.cells
+    position = (board.stone_mask(1) + 2 * board.stone_mask(2)).ravel().astype(np.int8)
+    empties = np.flatnonzero(position == 0)
+
+    boards = np.tile(position, (playouts, 1))
+    if len(empties):
+        # Orden aleatorio independiente por fila
+        order = np.argsort(rng.random((playouts, len(empties))), axis=1)
+        turns = np.where(np.arange(len(empties)) % 2 == 0, to_move, 3 - to_move).astype(np.int8)
+        boards[np.arange(playouts)[:, None], empties[order]] = turns
+
+    return PlayoutStats(_player_one_wins(boards, geometry), boards, board.size)
+
+
+def _player_one_wins(boards: np.ndarray, geometry) -> np.ndarray:
+    """Propagación desde el borde izquierdo del jugador 1 hasta que no cambie nada"""
+    left_mask, right_mask = geometry.edge_masks[1]
+    left = np.array([(left_mask >> i) & 1 for i in range(geometry.cells)], dtype=bool)
+    right = np.array([(right_mask >> i) & 1 for i in range(geometry.cells)], dtype=bool)
+
+    own = boards == 1
+    reached = own & left
+    # Columna extra siempre falsa para los vecinos centinela
+    padded = np.zeros((len(boards), geometry.cells + 1), dtype=bool)
+    while True:
+        padded[:, :-1] = reached
+        grown = own & (reached | padded[:, geometry.neighbor_index].any(axis=2))
+        if np.array_equal(grown, reached):
+            break
+        reached = grown
+    return (reached & right).any(axis=1)
+
+
+class MonteCarloEvaluator(Evaluator):
+    """Evaluación de hojas por partidas aleatorias en lote (2 * tasa de victoria - 1)
+
+    Supone que el jugador 1 mueve primero, así que le toca a quien tenga menos fichas.
+    """
+
+    def __init__(self, playouts: int = 256, seed: int = None, cache_size: int = 100000):
+        self.playouts = playouts
+        self.rng = np.random.default_rng(seed)
+        self.cache = {}
+        self.cache_size = cache_size
+
+    def evaluate(self, board: HexBoard, player_id: int) -> float:
+        if board.hash not in self.cache:
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            to_move = 1 if board.bits[1].bit_count() <= board.bits[2].bit_count() else 2
+            stats = batch_playouts(board, to_move, self.playouts, self.rng)
+            self.cache[board.hash] = stats.win_rate[1]
+        win_rate = self.cache[board.hash] if player_id == 1 else 1.0 - self.cache[board.hash]
+        return 2.0 * win_rate - 1.0
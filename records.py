@@ -0,0 +1,273 @@
+"""Registro binario compacto de partidas con escritura y lectura en flujo
+
+Formato del archivo de partidas:
+    MAGIC, y después cada partida como varint(longitud) + cuerpo:
+    tamaño (u8), banderas (u8), ganador (u8, 0 si no terminó),
+    nombre del jugador 1 y del 2 (varint longitud + UTF-8),
+    varint número de jugadas, una varint por jugada (fila * tamaño + columna)
+    y, si la bandera HAS_STATS está activa, (nodos, profundidad, milisegundos)
+    en varints por cada jugada.
+
+Las jugadas alternan empezando por el jugador 1, como en HexBoard. Con el
+índice (archivo .idx: INDEX_MAGIC, número de partidas y un uint64 de
+desplazamiento por partida) GameArchive accede a la partida N con mmap sin
+leer las anteriores.
+"""
+import mmap
+import os
+import numpy as np
+from board import HexBoard
+
+MAGIC = b'HEXGAME1'
+INDEX_MAGIC = b'HEXRIDX1'
+INDEX_HEADER_BYTES = 16  # INDEX_MAGIC + número de partidas (uint64)
+HAS_STATS = 1
+
+
+def encode_varint(value: int) -> bytes:
+    """Entero no negativo en grupos de 7 bits, el menos significativo primero"""
+    if value < 0:
+        raise ValueError(f"Las varints no admiten negativos: {value}")
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(buffer, position: int) -> tuple:
+    """(valor, posición siguiente) de la varint que empieza en `position`"""
+    value = shift = 0
+    while True:
+        byte = buffer[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def index_path(path: str) -> str:
+    return path + '.idx'
+
+
+class GameRecord:
+    """Una partida: tamaño, nombres de los jugadores, ganador, jugadas y estadísticas opcionales
+
+    `stats` es None o una lista con (nodos, profundidad, milisegundos) por jugada.
+    """
+
+    def __init__(self, size: int, players: tuple = ('', ''), winner: int = 0,
+                 moves: list = None, stats: list = None):
+        self.size = size
+        self.players = tuple(players)
+        self.winner = winner
+        self.moves = [tuple(move) for move in moves] if moves else []
+        self.stats = stats
+        if stats is not None and len(stats) != len(self.moves):
+            raise ValueError("Hace falta una entrada de estadísticas por jugada")
+
+    def positions(self):
+        """Genera (tablero, jugada, jugador) antes de cada jugada, sobre un único HexBoard
+
+        El tablero se reutiliza: hay que clonarlo si se guarda.
+        """
+        board = HexBoard(self.size)
+        player_id = 1
+        for row, col in self.moves:
+            yield board, (row, col), player_id
+            board.play(row, col, player_id)
+            player_id = 3 - player_id
+
+    def final_board(self) -> HexBoard:
+        board = HexBoard(self.size)
+        for index, (row, col) in enumerate(self.moves):
+            board.play(row, col, 1 + index % 2)
+        return board
+
+    def encode(self) -> bytes:
+        """Cuerpo binario de la partida (sin el prefijo de longitud)"""
+        out = bytearray((self.size, HAS_STATS if self.stats is not None else 0, self.winner))
+        for name in self.players:
+            encoded = name.encode('utf-8')
+            out += encode_varint(len(encoded))
+            out += encoded
+        out += encode_varint(len(self.moves))
+        for row, col in self.moves:
+            out += encode_varint(row * self.size + col)
+        if self.stats is not None:
+            for nodes, depth, milliseconds in self.stats:
+                out += encode_varint(int(nodes))
+                out += encode_varint(int(depth))
+                out += encode_varint(int(milliseconds))
+        return bytes(out)
+
+    @classmethod
+    def decode(cls, buffer, position: int = 0) -> 'GameRecord':
+        size, flags, winner = buffer[position], buffer[position + 1], buffer[position + 2]
+        position += 3
+        players = []
+        for _ in range(2):
+            length, position = decode_varint(buffer, position)
+            players.append(bytes(buffer[position:position + length]).decode('utf-8'))
+            position += length
+        count, position = decode_varint(buffer, position)
+        moves = []
+        for _ in range(count):
+            index, position = decode_varint(buffer, position)
+            moves.append(divmod(index, size))
+        stats = None
+        if flags & HAS_STATS:
+            stats = []
+            for _ in range(count):
+                nodes, position = decode_varint(buffer, position)
+                depth, position = decode_varint(buffer, position)
+                milliseconds, position = decode_varint(buffer, position)
+                stats.append((nodes, depth, milliseconds))
+        return cls(size, tuple(players), winner, moves, stats)
+
+    def __repr__(self) -> str:
+        return f"GameRecord({self.size}x{self.size} {self.players[0]} vs {self.players[1]}, " \
+               f"{len(self.moves)} jugadas, gana {self.winner})"
+
+
+class RecordWriter:
+    """Escritura en flujo: cada write() añade una partida al final del archivo
+
+    Con `append` se continúa un archivo existente. Al cerrar se escribe el
+    índice si `index` es True.
+    """
+
+    def __init__(self, path: str, append: bool = False, index: bool = True):
+        self.path = path
+        self.index = index
+        self.offsets = []
+        if append and os.path.exists(path) and os.path.getsize(path) > 0:
+            self.offsets = list(_scan_offsets(path))
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+
+    def write(self, record: GameRecord) -> int:
+        """Añade la partida y devuelve su número"""
+        body = record.encode()
+        self.offsets.append(self.file.tell())
+        self.file.write(encode_varint(len(body)))
+        self.file.write(body)
+        return len(self.offsets) - 1
+
+    def close(self):
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        if self.index:
+            write_index(self.path, self.offsets)
+
+    def __enter__(self) -> 'RecordWriter':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_magic(record_file, path: str):
+    if record_file.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"No es un archivo de partidas: {path}")
+
+
+def _read_varint(record_file):
+    """Varint leída del archivo, o None al final"""
+    value = shift = 0
+    while True:
+        byte = record_file.read(1)
+        if not byte:
+            if shift:
+                raise ValueError("Archivo de partidas truncado")
+            return None
+        value |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+def _scan_offsets(path: str):
+    """Desplazamiento de cada partida recorriendo los prefijos de longitud"""
+    with open(path, 'rb') as record_file:
+        _check_magic(record_file, path)
+        while True:
+            offset = record_file.tell()
+            length = _read_varint(record_file)
+            if length is None:
+                return
+            yield offset
+            record_file.seek(length, os.SEEK_CUR)
+
+
+def read_records(path: str):
+    """Genera las partidas del archivo una a una sin cargarlo entero"""
+    with open(path, 'rb') as record_file:
+        _check_magic(record_file, path)
+        while True:
+            length = _read_varint(record_file)
+            if length is None:
+                return
+            body = record_file.read(length)
+            if len(body) != length:
+                raise ValueError("Archivo de partidas truncado")
+            yield GameRecord.decode(body)
+
+
+def write_index(path: str, offsets=None):
+    """Escribe el índice de `path` (recorriendo el archivo si no se dan los desplazamientos)"""
+    offsets = np.asarray(list(_scan_offsets(path)) if offsets is None else offsets, dtype='<u8')
+    with open(index_path(path), 'wb') as index_file:
+        index_file.write(INDEX_MAGIC)
+        index_file.write(np.uint64(len(offsets)).tobytes())
+        index_file.write(offsets.tobytes())
+
+
+class GameArchive:
+    """Acceso aleatorio de solo lectura a la partida N con mmap de partidas e índice"""
+
+    def __init__(self, path: str):
+        if not os.path.exists(index_path(path)):
+            write_index(path)
+        with open(index_path(path), 'rb') as index_file:
+            header = index_file.read(INDEX_HEADER_BYTES)
+        if header[:8] != INDEX_MAGIC:
+            raise ValueError(f"No es un índice de partidas: {index_path(path)}")
+        count = int(np.frombuffer(header[8:], dtype=np.uint64)[0])
+        self.path = path
+        self.offsets = (np.memmap(index_path(path), dtype='<u8', mode='r', offset=INDEX_HEADER_BYTES,
+                                  shape=(count,)) if count else np.zeros(0, dtype='<u8'))
+        self.file = open(path, 'rb')
+        _check_magic(self.file, path)
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, number: int) -> GameRecord:
+        if number < 0:
+            number += len(self)
+        if not 0 <= number < len(self):
+            raise IndexError(f"No hay partida {number}")
+        _, position = decode_varint(self.data, int(self.offsets[number]))
+        return GameRecord.decode(self.data, position)
+
+    def __iter__(self):
+        for number in range(len(self)):
+            yield self[number]
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self) -> 'GameArchive':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
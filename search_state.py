@@ -0,0 +1,74 @@
+import numpy as np
+from board import HexBoard
+
+class SearchState:
+    """Estado de búsqueda que se conserva entre jugadas de una misma partida
+
+    Guarda la tabla de historia por casilla, las jugadas killer por ply y la
+    variante principal esperada. En cada jugada se comparan los bits del tablero
+    con los de la llamada anterior para saber qué se jugó desde entonces.
+    """
+
+    def __init__(self, size: int, max_plies: int = 64):
+        self.size = size
+        self.max_plies = max_plies
+        self.reset()
+
+    def reset(self):
+        """Olvida todo (partida nueva)"""
+        self.history = np.zeros(self.size * self.size)
+        self.killers = [[None, None] for _ in range(self.max_plies)]
+        self.pv = []        # Jugadas esperadas a partir de la posición guardada
+        self.bits = None    # Fichas de cada jugador tras nuestra última jugada
+
+    def sync(self, board: HexBoard) -> list:
+        """Jugadas (índice, jugador) hechas desde la última llamada; None si es otra partida"""
+        if self.bits is None or board.size != self.size:
+            self.reset()
+            return None
+        if (self.bits[1] & ~board.bits[1]) or (self.bits[2] & ~board.bits[2]):
+            self.reset()
+            return None
+        new_moves = []
+        for player_id in (1, 2):
+            added = board.bits[player_id] & ~self.bits[player_id]
+            while added:
+                low = added & -added
+                new_moves.append((low.bit_length() - 1, player_id))
+                added ^= low
+        self.age(new_moves)
+        return new_moves
+
+    def age(self, new_moves: list):
+        """Envejece la historia y desplaza killers y variante principal"""
+        plies = len(new_moves)
+        self.history *= 0.5
+        # La raíz nueva está nuestra jugada más las del rival por delante de la anterior
+        shift = min(plies + 1, self.max_plies)
+        self.killers = self.killers[shift:] + [[None, None] for _ in range(shift)]
+        played = sorted(index for index, _ in new_moves)
+        if sorted(self.pv[:plies]) == played:
+            self.pv = self.pv[plies:]
+        else:
+            self.pv = []
+
+    def finish(self, board: HexBoard, move: tuple, player_id: int, pv: list):
+        """Recuerda la posición tras nuestra jugada y la continuación esperada"""
+        self.bits = list(board.bits)
+        self.bits[player_id] |= 1 << (move[0] * self.size + move[1])
+        self.pv = pv[:self.max_plies]
+
+    def record_cutoff(self, index: int, depth: int, ply: int):
+        """Premia la jugada que produjo un corte"""
+        self.history[index] += depth * depth
+        if ply < self.max_plies:
+            killers = self.killers[ply]
+            if killers[0] != index:
+                killers[1] = killers[0]
+                killers[0] = index
+
+    def killer_moves(self, ply: int) -> list:
+        """Jugadas killer del ply (índices planos, las más recientes primero)"""
+        if ply >= self.max_plies:
+            return []
+        return [index for index in self.killers[ply] if index is not None]
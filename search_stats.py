@@ -0,0 +1,63 @@
+class SearchStats:
+    """Resumen de una llamada a play() que reciben los ganchos `on_stats` de los jugadores
+
+    `source` dice de dónde salió la jugada: 'search', 'parallel', 'book',
+    'opening', 'forced' (victoria o bloqueo inmediato) o 'solver'. Las
+    iteraciones son (profundidad, nodos, segundos) de cada profundidad
+    completada. Las tasas de la caché son None si el jugador no la consultó.
+    """
+
+    def __init__(self, player: str, player_id: int, move: tuple, source: str, seconds: float,
+                 nodes: int, depth: int, score: float, iterations: list, cutoffs: int,
+                 cache_probes: int, cache_hits: int, pv: list):
+        self.player = player
+        self.player_id = player_id
+        self.move = move
+        self.source = source
+        self.seconds = seconds
+        self.nodes = nodes
+        self.depth = depth
+        self.score = score
+        self.iterations = iterations
+        self.cutoffs = cutoffs
+        self.cache_probes = cache_probes
+        self.cache_hits = cache_hits
+        self.pv = pv
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def cutoff_rate(self) -> float:
+        """Fracción de nodos que terminaron con un corte beta"""
+        return self.cutoffs / self.nodes if self.nodes else 0.0
+
+    @property
+    def cache_hit_rate(self):
+        return self.cache_hits / self.cache_probes if self.cache_probes else None
+
+    def as_dict(self) -> dict:
+        """Registro plano apto para JSON o un log"""
+        return {
+            'player': self.player,
+            'player_id': self.player_id,
+            'move': list(self.move) if self.move is not None else None,
+            'source': self.source,
+            'seconds': self.seconds,
+            'nodes': self.nodes,
+            'nodes_per_second': self.nodes_per_second,
+            'depth': self.depth,
+            'score': self.score,
+            'iterations': [list(iteration) for iteration in self.iterations],
+            'cutoffs': self.cutoffs,
+            'cutoff_rate': self.cutoff_rate,
+            'cache_probes': self.cache_probes,
+            'cache_hits': self.cache_hits,
+            'cache_hit_rate': self.cache_hit_rate,
+            'pv': [list(move) for move in self.pv],
+        }
+
+    def __repr__(self) -> str:
+        return (f"SearchStats({self.player} {self.move} por {self.source}: profundidad {self.depth}, "
+                f"{self.nodes} nodos en {self.seconds:.3f}s, {self.nodes_per_second:.0f} nodos/s)")
@@ -0,0 +1,285 @@
+import time
+from board import HexBoard
+from transposition import SIDE_TO_MOVE_KEY
+
+# Número de prueba/refutación "infinito"
+INFINITE = 10 ** 9
+
+
+class EndgameSolver:
+    """Resolución exacta de finales con búsqueda de números de prueba en profundidad (DFPN)
+
+    Cada nodo guarda (phi, delta) desde el punto de vista de quien mueve:
+    phi = 0 demuestra que gana y delta = 0 que pierde. Antes de generar hijos
+    se aplica la regla de victoria: si quien mueve gana en una jugada el nodo
+    está resuelto, si el rival tiene dos victorias inmediatas está perdido y si
+    tiene una sola la única jugada a considerar es bloquearla.
+    """
+
+    def __init__(self, max_entries: int = 1000000, check_every: int = 256):
+        self.table = {}      # clave -> (phi, delta)
+        self.distances = {}  # clave de posición resuelta -> jugadas hasta el final
+        # clave -> [mayor cota sin victoria, menor cota con victoria, jugada ganadora]
+        self.bounded = {}
+        # clave -> [mayor cota sin derrota, menor cota con derrota] de quien mueve
+        self.bounded_losses = {}
+        self.max_entries = max_entries
+        self.check_every = check_every
+        self.nodes = 0
+
+    def solve(self, board: HexBoard, player_id: int, deadline: float = None) -> tuple:
+        """(True, jugada) si player_id gana con la línea más corta demostrada,
+        (False, None) si pierde contra cualquier defensa y (None, None) si no
+        se resolvió antes de `deadline` (instante de time.monotonic())."""
+        self.deadline = deadline if deadline is not None else float('inf')
+        self.countdown = self.check_every
+        if self.entries() > self.max_entries:
+            # Vaciado completo: conservar las demostradas haría crecer las tablas sin límite
+            self.table.clear()
+            self.distances.clear()
+            self.bounded.clear()
+            self.bounded_losses.clear()
+        board = board.clone()
+        key = self._key(board.hash, player_id)
+        try:
+            phi, delta = self._mid(board, player_id, key, INFINITE, INFINITE)
+            if phi == 0:
+                move = self._best_move(board, player_id)
+                if move is not None:
+                    return True, move
+            if delta == 0:
+                return False, None
+        except TimeoutError:
+            pass
+        return None, None
+
+    def entries(self) -> int:
+        """Entradas guardadas entre todas las tablas"""
+        return len(self.table) + len(self.distances) + len(self.bounded) + len(self.bounded_losses)
+
+    def _key(self, board_hash: int, to_move: int) -> int:
+        return board_hash ^ SIDE_TO_MOVE_KEY if to_move == 2 else board_hash
+
+    def _moves(self, board: HexBoard, to_move: int):
+        """(resultado inmediato o None, jugadas a considerar) según la regla de victoria"""
+        wins, opponent_wins = board.find_forced_moves(to_move)
+        if wins:
+            return (0, INFINITE), [min(wins)]
+        if len(opponent_wins) > 1:
+            return (INFINITE, 0), []
+        if opponent_wins:
+            return None, list(opponent_wins)
+        return None, board.get_possible_moves()
+
+    def _mid(self, board: HexBoard, to_move: int, key: int, phi_limit: int, delta_limit: int) -> tuple:
+        self.nodes += 1
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.countdown = self.check_every
+            if time.monotonic() >= self.deadline:
+                raise TimeoutError()
+
+        result, moves = self._moves(board, to_move)
+        if result is not None:
+            self.table[key] = result
+            return result
+
+        # Claves de los hijos sin jugar sobre el tablero (Zobrist incremental)
+        zobrist = board.geometry.zobrist[to_move]
+        size = board.size
+        opponent = 3 - to_move
+        children = [(move, self._key(board.hash ^ zobrist[move[0] * size + move[1]], opponent))
+                    for move in moves]
+
+        while True:
+            # phi del nodo: el mejor delta de los hijos; delta: suma de sus phi
+            phi, delta = INFINITE, 0
+            best = None
+            best_delta = second_delta = INFINITE
+            best_phi = 0
+            for move, child_key in children:
+                child_phi, child_delta = self.table.get(child_key, (1, 1))
+                delta = min(delta + child_phi, INFINITE)
+                if child_delta < best_delta:
+                    second_delta = best_delta
+                    best, best_delta, best_phi = (move, child_key), child_delta, child_phi
+                elif child_delta < second_delta:
+                    second_delta = child_delta
+            phi = best_delta
+            if phi >= phi_limit or delta >= delta_limit:
+                self.table[key] = (phi, delta)
+                return phi, delta
+
+            # Umbrales del hijo más prometedor
+            child_phi_limit = min(delta_limit - delta + best_phi, INFINITE)
+            child_delta_limit = min(phi_limit, second_delta + 1)
+            (row, col), child_key = best
+            board.play(row, col, to_move)
+            try:
+                self._mid(board, opponent, child_key, child_phi_limit, child_delta_limit)
+            finally:
+                board.undo()
+
+    def _best_move(self, board: HexBoard, to_move: int) -> tuple:
+        """Jugada que gana en el menor número de jugadas contra cualquier defensa
+
+        La prueba de DFPN da una cota superior (la línea demostrada más corta);
+        luego se busca con profundidad acotada si hay una victoria más rápida.
+        Si se acaba el tiempo se juega la de la prueba, que también gana.
+        """
+        move, distance = self._proof_move(board, to_move)
+        distance = min(distance, board.empty_count + 1)
+        try:
+            for plies in range(1, distance, 2):
+                faster = self._win_within(board, to_move, plies)
+                if faster is not None:
+                    return faster
+        except TimeoutError:
+            pass
+        return move
+
+    def _win_within(self, board: HexBoard, to_move: int, plies: int):
+        """Jugada con la que quien mueve gana en a lo sumo `plies` jugadas, o None"""
+        self._check_time()
+        key = self._key(board.hash, to_move)
+        bounds = self.bounded.get(key)
+        if bounds is None:
+            bounds = self.bounded[key] = [0, INFINITE, None]
+        # Sin victoria en n jugadas tampoco la hay en menos; con victoria en n, en más sí
+        if plies <= bounds[0]:
+            return None
+        if plies >= bounds[1]:
+            return bounds[2]
+        wins, opponent_wins = board.find_forced_moves(to_move)
+        if wins:
+            bounds[1:] = [1, min(wins)]
+            return bounds[2]
+        if plies < 3 or len(opponent_wins) > 1:
+            bounds[0] = plies if plies < 3 else INFINITE
+            return None
+        moves = list(opponent_wins) if opponent_wins else board.get_possible_moves()
+        opponent = 3 - to_move
+        # Lo demostrado por DFPN ordena y poda: primero las jugadas ganadoras,
+        # nunca las que dejan al rival con la victoria demostrada
+        zobrist = board.geometry.zobrist[to_move]
+        ranked = []
+        for row, col in moves:
+            phi, delta = self.table.get(self._key(board.hash ^ zobrist[row * board.size + col], opponent), (1, 1))
+            if phi != 0:
+                ranked.append((delta != 0, (row, col)))
+        ranked.sort()
+        for _, (row, col) in ranked:
+            board.play(row, col, to_move)
+            try:
+                # Todas las respuestas del rival deben perder a tiempo
+                forced = self._loses_within(board, opponent, plies - 1)
+            finally:
+                board.undo()
+            if forced:
+                bounds[1:] = [plies, (row, col)]
+                return row, col
+        bounds[0] = plies
+        return None
+
+    def _loses_within(self, board: HexBoard, to_move: int, plies: int) -> bool:
+        """¿Pierde quien mueve en a lo sumo `plies` jugadas contra la mejor continuación?"""
+        key = self._key(board.hash, to_move)
+        bounds = self.bounded_losses.get(key)
+        if bounds is None:
+            bounds = self.bounded_losses[key] = [0, INFINITE]
+        if plies <= bounds[0]:
+            return False
+        if plies >= bounds[1]:
+            return True
+        threats, own_wins = board.find_forced_moves(3 - to_move)
+        if own_wins:
+            bounds[0] = INFINITE
+            return False
+        if len(threats) > 1:
+            bounds[1] = 2
+            return True
+        # Con una amenaza solo sirve bloquearla; sin amenazas hace falta más profundidad
+        if not threats and plies < 4:
+            bounds[0] = plies
+            return False
+        replies = list(threats) if threats else board.get_possible_moves()
+        for row, col in replies:
+            board.play(row, col, to_move)
+            try:
+                if self._win_within(board, 3 - to_move, plies - 1) is None:
+                    bounds[0] = plies
+                    return False
+            finally:
+                board.undo()
+        bounds[1] = plies
+        return True
+
+    def _proof_move(self, board: HexBoard, to_move: int) -> tuple:
+        """(jugada, distancia) de la línea ganadora más corta dentro de la prueba"""
+        _, moves = self._moves(board, to_move)
+        best_move, best_distance = None, INFINITE
+        for row, col in moves:
+            board.play(row, col, to_move)
+            try:
+                if board.check_connection(to_move):
+                    return (row, col), 1
+                # Solo sirven los hijos demostrados como derrota del rival
+                entry = self.table.get(self._key(board.hash, 3 - to_move))
+                distance = self._distance(board, 3 - to_move) if entry and entry[1] == 0 else None
+            finally:
+                board.undo()
+            if distance is not None and 1 + distance < best_distance:
+                best_move, best_distance = (row, col), 1 + distance
+        return best_move, best_distance
+
+    def _distance(self, board: HexBoard, to_move: int):
+        """Jugadas hasta el final en el árbol demostrado (el ganador acorta, el perdedor alarga)
+
+        None si la posición no está demostrada en la tabla.
+        """
+        key = self._key(board.hash, to_move)
+        if key in self.distances:
+            return self.distances[key]
+        self._check_time()
+        entry = self.table.get(key)
+        if entry is None or 0 not in entry:
+            return None
+        wins = entry[0] == 0
+        result, moves = self._moves(board, to_move)
+        if result is not None:
+            # Victoria en una jugada o dos amenazas del rival imposibles de bloquear
+            distance = 1 if wins else 2
+        else:
+            # El ganador elige entre los hijos perdidos para el rival; el perdedor
+            # tiene todos sus hijos ganados por el rival y elige el más largo
+            zobrist = board.geometry.zobrist[to_move]
+            distances = []
+            for row, col in moves:
+                child_key = self._key(board.hash ^ zobrist[row * board.size + col], 3 - to_move)
+                child_entry = self.table.get(child_key)
+                if child_entry is None or child_entry[1 if wins else 0] != 0:
+                    if wins:
+                        continue
+                    return None
+                board.play(row, col, to_move)
+                try:
+                    child = self._distance(board, 3 - to_move)
+                finally:
+                    board.undo()
+                if child is None:
+                    if wins:
+                        continue
+                    return None
+                distances.append(child)
+            if not distances:
+                return None
+            distance = 1 + (min(distances) if wins else max(distances))
+        self.distances[key] = distance
+        return distance
+
+    def _check_time(self):
+        self.countdown -= 1
+        if self.countdown <= 0:
+            self.countdown = self.check_every
+            if time.monotonic() >= self.deadline:
+                raise TimeoutError()
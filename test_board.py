@@ -0,0 +1,93 @@
+"""Comprobaciones de HexBoard contra versiones por fuerza bruta (python -m pytest)"""
+import random
+from collections import deque
+from board import HexBoard, random_position
+from player import HexPlayer
+
+POSITIONS = 400
+
+
+def _random_board(rng: random.Random) -> HexBoard:
+    """Tablero de 1x1 a 9x9 con fichas de colores al azar (puede haber conexiones)"""
+    size = rng.randint(1, 9)
+    return random_position(size, rng.randint(0, size * size), rng, finished=True)
+
+
+def _connected(board: HexBoard, player_id: int) -> bool:
+    """Búsqueda en anchura desde el borde inicial del jugador"""
+    size = board.size
+    if player_id == 1:
+        start = [(row, 0) for row in range(size)]
+        reached = lambda row, col: col == size - 1
+    else:
+        start = [(0, col) for col in range(size)]
+        reached = lambda row, col: row == size - 1
+    pending = deque(cell for cell in start if board.board[cell[0]][cell[1]] == player_id)
+    seen = set(pending)
+    while pending:
+        row, col = pending.popleft()
+        if reached(row, col):
+            return True
+        for neighbor in board.get_adjacent_hexes(row, col):
+            if neighbor not in seen and board.board[neighbor[0]][neighbor[1]] == player_id:
+                seen.add(neighbor)
+                pending.append(neighbor)
+    return False
+
+
+def test_check_connection_matches_search():
+    rng = random.Random(5)
+    for _ in range(POSITIONS):
+        board = _random_board(rng)
+        for player_id in (1, 2):
+            assert board.check_connection(player_id) == _connected(board, player_id)
+
+
+def test_undo_restores_connections():
+    rng = random.Random(6)
+    for _ in range(POSITIONS // 4):
+        board = _random_board(rng)
+        before = (board.check_connection(1), board.check_connection(2), board.hash, board.empty_count)
+        moves = board.get_possible_moves()
+        rng.shuffle(moves)
+        for move in moves:
+            board.play(*move, rng.choice((1, 2)))
+        for _ in moves:
+            board.undo()
+        assert (board.check_connection(1), board.check_connection(2), board.hash, board.empty_count) == before
+        assert sorted(board.empty_cells()) == [row * board.size + col for row, col in board.get_possible_moves()]
+
+
+def test_winning_moves_match_brute_force():
+    rng = random.Random(7)
+    for _ in range(POSITIONS):
+        board = _random_board(rng)
+        brute = {}
+        for player_id in (1, 2):
+            brute[player_id] = set()
+            if board.check_connection(player_id):
+                continue
+            for move in board.get_possible_moves():
+                board.play(*move, player_id)
+                if board.check_connection(player_id):
+                    brute[player_id].add(move)
+                board.undo()
+            assert board.winning_moves(player_id) == brute[player_id]
+        # Victorias propias y bloqueos obligados en una sola llamada
+        if not board.check_connection(1) and not board.check_connection(2):
+            assert board.find_forced_moves(1) == (brute[1], brute[2])
+
+
+def test_player_takes_wins_and_blocks():
+    rng = random.Random(8)
+    checked = 0
+    while checked < 40:
+        board = _random_board(rng)
+        if board.size < 3 or board.check_connection(1) or board.check_connection(2):
+            continue
+        wins, opponent_wins = board.find_forced_moves(1)
+        if not wins and len(opponent_wins) != 1:
+            continue
+        move = HexPlayer(1, endgame_threshold=0).play(board, 0.05)
+        assert move in (wins or opponent_wins)
+        checked += 1
@@ -0,0 +1,62 @@
+"""Conexiones virtuales, casillas muertas y plantillas contra el resolvedor exacto (python -m pytest)"""
+import random
+from board import random_position
+from patterns import TEMPLATE_SHAPES, dead_cells, reduce_moves, template_shapes, virtual_chain
+from solver import EndgameSolver
+
+
+def _positions(count: int, seed: int):
+    """(tablero, quien mueve) de 4x4 y 5x5 con fichas alternas al azar y sin conexión completa"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        size = rng.choice((4, 5))
+        # Entre 6 y 14 casillas vacías: el resolvedor termina en milisegundos
+        board = random_position(size, rng.randint(max(size, size * size - 14), size * size - 6), rng)
+        yield board, 1 + (board.bits[1].bit_count() > board.bits[2].bit_count())
+
+
+def test_template_shapes_are_up_to_date():
+    assert template_shapes() == TEMPLATE_SHAPES
+
+
+def test_virtual_chain_is_a_win():
+    chains = 0
+    for board, _ in _positions(300, 3):
+        for player_id in (1, 2):
+            if virtual_chain(board, player_id):
+                chains += 1
+                # Aunque mueva el rival, no puede evitar la conexión
+                won, _ = EndgameSolver().solve(board, 3 - player_id)
+                assert won is False
+    assert chains > 0
+
+
+def test_dead_cells_do_not_change_the_result():
+    checked = 0
+    for board, to_move in _positions(300, 4):
+        dead = dead_cells(board)
+        if not dead:
+            continue
+        checked += 1
+        result, _ = EndgameSolver().solve(board, to_move)
+        for index in dead:
+            for player_id in (1, 2):
+                board.play(*divmod(index, board.size), player_id)
+                if not board.check_connection(1) and not board.check_connection(2):
+                    assert EndgameSolver().solve(board, to_move)[0] == result
+                board.undo()
+    assert checked > 0
+
+
+def test_reduced_moves_keep_a_win():
+    for board, to_move in _positions(100, 5):
+        won, _ = EndgameSolver().solve(board, to_move)
+        if not won:
+            continue
+        winners = 0
+        for move in reduce_moves(board, to_move, board.get_possible_moves()):
+            board.play(*move, to_move)
+            if board.check_connection(to_move) or EndgameSolver().solve(board, 3 - to_move)[0] is False:
+                winners += 1
+            board.undo()
+        assert winners > 0
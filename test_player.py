@@ -0,0 +1,57 @@
+"""Búsqueda de HexPlayer en posiciones con resultado conocido (python -m pytest)"""
+import math
+import random
+from board import HexBoard, random_position
+from player import HexPlayer
+from solver import EndgameSolver
+
+# 4x4 en el que el jugador 2 gana en tres jugadas sin victoria inmediata: (tamaño, fichas, semilla)
+FORCED_WIN = (4, 5, 4)
+
+
+def _forced_win():
+    size, stones, seed = FORCED_WIN
+    return random_position(size, stones, random.Random(seed))
+
+
+def _searcher(board, player_id: int) -> HexPlayer:
+    player = HexPlayer(player_id, endgame_threshold=0, patterns=False)
+    player.size = board.size
+    player.calculate_weights()
+    player.tt.new_search()
+    # Con un límite, un bucle sin fin acaba en TimeoutError en vez de colgar la prueba
+    player.clock.start(board, 2.0)
+    return player
+
+
+def test_aspiration_keeps_a_proven_win():
+    board = _forced_win()
+    assert board.find_forced_moves(2) == (set(), set())
+    moves = board.get_possible_moves()
+    player = _searcher(board, 2)
+    _, guess = player.alpha_beta_search(board.clone(), moves, 1)
+    assert math.isfinite(guess)
+    move, value = player.aspiration_search(board.clone(), moves, 3, guess)
+    assert value == math.inf
+    board.play(*move, 2)
+    assert EndgameSolver().solve(board, 1)[0] is False
+
+
+def test_play_finds_the_forced_win():
+    board = _forced_win()
+    move = HexPlayer(2, endgame_threshold=0).play(board, 0.5)
+    board.play(*move, 2)
+    assert EndgameSolver().solve(board, 1)[0] is False
+
+
+def test_parallel_stats_count_worker_nodes():
+    records = []
+    player = HexPlayer(1, workers=2, on_stats=records.append)
+    try:
+        board = HexBoard(7)
+        board.play(3, 3, 2)
+        player.play(board, 0.3)
+    finally:
+        player.close()
+    assert records[0].source == 'parallel'
+    assert records[0].nodes > 0
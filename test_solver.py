@@ -0,0 +1,65 @@
+"""EndgameSolver contra minimax exhaustivo en finales pequeños (python -m pytest)"""
+import random
+from board import HexBoard, random_position
+from solver import EndgameSolver
+
+# Resultados de minimax por (hash, quien mueve), compartidos entre las pruebas
+_MINIMAX = {}
+
+
+def _minimax(board: HexBoard, to_move: int, memo: dict = _MINIMAX) -> tuple:
+    """(gana quien mueve, jugadas hasta el final con el mejor juego de ambos)"""
+    key = (board.hash, to_move)
+    if key not in memo:
+        wins, losses = [], []
+        for move in board.get_possible_moves():
+            board.play(*move, to_move)
+            if board.check_connection(to_move):
+                wins.append(1)
+            else:
+                won, distance = _minimax(board, 3 - to_move, memo)
+                (losses if won else wins).append(distance + 1)
+            board.undo()
+        memo[key] = (True, min(wins)) if wins else (False, max(losses))
+    return memo[key]
+
+
+def _positions():
+    for seed in range(40):
+        size, empty = (4, 9) if seed < 20 else (5, 10)
+        board = random_position(size, size * size - empty, random.Random(seed))
+        yield board, 1 + (board.bits[1].bit_count() > board.bits[2].bit_count())
+
+
+def test_solver_matches_minimax():
+    for board, to_move in _positions():
+        won, move = EndgameSolver().solve(board, to_move)
+        assert won == _minimax(board, to_move)[0]
+        assert (move is not None) == won
+
+
+def test_solver_plays_shortest_win():
+    for board, to_move in _positions():
+        won, move = EndgameSolver().solve(board, to_move)
+        if not won:
+            continue
+        _, shortest = _minimax(board, to_move)
+        board.play(*move, to_move)
+        if board.check_connection(to_move):
+            assert shortest == 1
+        else:
+            opponent_won, distance = _minimax(board, 3 - to_move)
+            assert not opponent_won and distance + 1 == shortest
+
+
+def test_full_tables_are_cleared():
+    # Con max_entries diminuto cada llamada empieza con las tablas vacías
+    solver = EndgameSolver(max_entries=50)
+    for board, to_move in _positions():
+        full = solver.entries() > solver.max_entries
+        won, _ = solver.solve(board, to_move)
+        assert won == _minimax(board, to_move)[0]
+        if full:
+            fresh = EndgameSolver()
+            fresh.solve(board, to_move)
+            assert solver.entries() == fresh.entries()
@@ -1,12 +1,23 @@
 import math
-import time
 import random
 from board import HexBoard
+from evaluation import Evaluator
+from geometry import get_geometry
+from opening_book import OpeningBook
+from patterns import reduce_moves
 from player import Player
-from collections import deque
+from search_state import SearchState
+from search_stats import SearchStats
+from time_manager import TimeManager
+from collections import OrderedDict, deque
 
 class AIPlayer(Player):
-    def __init__(self, player_id: int, time_limit: float = 2.0):
+    # Profundidad restante mínima para podar con patrones (cerca de las hojas no compensa)
+    PATTERN_MIN_DEPTH = 3
+
+    def __init__(self, player_id: int, time_limit: float = 2.0, leaf_evaluator: Evaluator = None,
+                 eval_cache_size: int = 200000, game_time: float = None, opening_book: str = None,
+                 patterns: bool = True, on_stats=None):
         super().__init__(player_id)
         self.opponent_id = 3 - player_id
         self.time_limit = time_limit
@@ -14,14 +25,34 @@ class AIPlayer(Player):
         self.current_depth = 0
         self.size = None
         self.move_history = []
+        # Evaluador alternativo de hojas (p. ej. ResistanceEvaluator)
+        self.leaf_evaluator = leaf_evaluator
         
         # Parámetros de optimización
         self.opening_moves = {}  # Diccionario de aperturas para tamaños comunes
         self._init_opening_book()
+        # Libro precalculado (opening_book.py); tiene prioridad sobre el diccionario
+        self.book = OpeningBook(opening_book) if opening_book is not None else None
+        
+        # Estado conservado entre jugadas: historia, killers y evaluaciones ya hechas
+        self.state = None
+        self.eval_cache = OrderedDict()
+        self.eval_cache_size = eval_cache_size
+        # Límite duro de time_limit por jugada; con game_time se reparte por fases
+        self.clock = TimeManager(game_time)
+        # Poda por casillas muertas y región obligatoria (patterns.py)
+        self.patterns = patterns
         
         # Estadísticas para seguimiento
         self.nodes_evaluated = 0
         self.prunes = 0
+        self.cache_probes = 0
+        self.cache_hits = 0
+        self.move_source = None
+        self.completed_depth = 0
+        self.best_value = None
+        # Gancho opcional: recibe un SearchStats al final de cada play() (None: no se construye)
+        self.on_stats = on_stats
 
     def _init_opening_book(self):
         """Aperturas conocidas para HEX"""
@@ -38,7 +69,6 @@ class AIPlayer(Player):
 
     def play(self, board: HexBoard) -> tuple:
         self.size = board.size
-        start_time = time.time()
         possible_moves = board.get_possible_moves()
         
         # Verificar si el juego ya terminó
@@ -48,43 +78,72 @@ class AIPlayer(Player):
         if not possible_moves:
             raise ValueError("No hay movimientos posibles")
         
+        # Jugadas hechas desde la última llamada; None si empieza otra partida
+        if self.state is None or self.state.size != self.size:
+            self.state = SearchState(self.size)
+        if self.state.sync(board) is None:
+            self.move_history = []
+            self.clock.new_game()
+        self.clock.start(board, self.time_limit)
+        
         # Movimiento por defecto (aleatorio)
         self.best_move = random.choice(possible_moves)
         self.nodes_evaluated = 0
         self.prunes = 0
+        self.cache_probes = self.cache_hits = 0
+        self.move_source, self.completed_depth, self.best_value = 'search', 0, None
         
         # Usar apertura conocida si está disponible
+        if self.book is not None:
+            book_move = self.book.lookup(board, self.player_id)
+            if book_move is not None:
+                self.move_source = 'book'
+                return self._remember(board, book_move)
         if len(possible_moves) == self.size * self.size and self.size in self.opening_moves:
             if self.player_id in self.opening_moves[self.size]:
-                return random.choice(self.opening_moves[self.size][self.player_id])
+                self.move_source = 'opening'
+                return self._remember(board, random.choice(self.opening_moves[self.size][self.player_id]))
+        
+        # Copia de trabajo: la búsqueda juega y deshace jugadas sobre ella
+        board = board.clone()
+        
+        # Sin casillas muertas y, si el rival ya conecta virtualmente, solo su portador
+        if self.patterns:
+            possible_moves = reduce_moves(board, self.player_id, possible_moves)
         
         # Búsqueda con Iterative Deepening
         max_depth = min(20, self.size * 2)  # Límite de profundidad razonable
         for depth in range(1, max_depth + 1):
-            if time.time() - start_time > self.time_limit * 0.85:  # 15% de margen
+            # Solo se empieza una profundidad si se prevé que termine a tiempo
+            if not self.clock.can_start_iteration():
                 break
                 
             try:
+                self.clock.begin_iteration()
                 self.current_depth = depth
                 alpha = -math.inf
                 beta = math.inf
                 
                 # Ordenar movimientos por heurística antes de evaluar
                 ordered_moves = self._order_moves(board, possible_moves, self.player_id)
+                if depth > 1:
+                    # La mejor jugada de la profundidad anterior va primero
+                    ordered_moves.remove(self.best_move)
+                    ordered_moves.insert(0, self.best_move)
                 
                 best_value = -math.inf
                 for move in ordered_moves:
-                    new_board = board.clone()
-                    new_board.place_piece(*move, self.player_id)
-                    
-                    value = self._minimax(
-                        new_board, 
-                        depth - 1, 
-                        alpha, 
-                        beta, 
-                        False, 
-                        start_time
-                    )
+                    board.play(*move, self.player_id)
+                    try:
+                        value = self._minimax(
+                            board, 
+                            depth - 1, 
+                            alpha, 
+                            beta, 
+                            False
+                        )
+                    finally:
+                        board.undo()
                     
                     if value > best_value or (value == best_value and self.best_move not in possible_moves):
                         best_value = value
@@ -94,18 +153,31 @@ class AIPlayer(Player):
                     if alpha >= beta:
                         self.prunes += 1
                         break
-                        
+                
+                self.clock.end_iteration()
+                self.completed_depth, self.best_value = depth, best_value
             except TimeoutError:
                 break
         
-        # Guardar el movimiento en el historial
-        self.move_history.append(self.best_move)
-        return self.best_move
+        return self._remember(board, self.best_move)
 
-    def _minimax(self, board, depth, alpha, beta, maximizing, start_time):
+    def _remember(self, board, move):
+        """Guarda la jugada en el historial y la posición resultante para la próxima llamada"""
+        self.move_history.append(move)
+        self.state.finish(board, move, self.player_id, [])
+        elapsed = self.clock.finish()
+        if self.on_stats is not None:
+            # Sin tabla de transposición la variante principal es solo la jugada
+            self.on_stats(SearchStats(
+                'AIPlayer', self.player_id, move, self.move_source, elapsed, self.nodes_evaluated,
+                self.completed_depth, self.best_value,
+                [(k + 1, nodes, seconds) for k, (nodes, seconds) in enumerate(self.clock.iterations)],
+                self.prunes, self.cache_probes, self.cache_hits, [move]))
+        return move
+
+    def _minimax(self, board, depth, alpha, beta, maximizing):
         """Minimax optimizado con alpha-beta pruning"""
-        if time.time() - start_time > self.time_limit:
-            raise TimeoutError()
+        self.clock.check()
             
         self.nodes_evaluated += 1
         
@@ -117,39 +189,51 @@ class AIPlayer(Player):
         if not possible_moves:
             return 0
         
-        # Ordenar movimientos por heurística
+        # Ordenar movimientos por heurística, con las killer de este ply delante
         current_player = self.player_id if maximizing else self.opponent_id
+        if self.patterns and depth >= self.PATTERN_MIN_DEPTH:
+            possible_moves = reduce_moves(board, current_player, possible_moves)
         ordered_moves = self._order_moves(board, possible_moves, current_player)
+        ply = self.current_depth - depth
+        for index in reversed(self.state.killer_moves(ply)):
+            killer = divmod(index, self.size)
+            if killer in ordered_moves:
+                ordered_moves.remove(killer)
+                ordered_moves.insert(0, killer)
         
         if maximizing:
             value = -math.inf
             for move in ordered_moves:
-                new_board = board.clone()
-                new_board.place_piece(*move, self.player_id)
-                
-                value = max(
-                    value, 
-                    self._minimax(new_board, depth - 1, alpha, beta, False, start_time)
-                )
+                board.play(*move, self.player_id)
+                try:
+                    value = max(
+                        value, 
+                        self._minimax(board, depth - 1, alpha, beta, False)
+                    )
+                finally:
+                    board.undo()
                 
                 alpha = max(alpha, value)
                 if alpha >= beta:
                     self.prunes += 1
+                    self.state.record_cutoff(move[0] * self.size + move[1], depth, ply)
                     break
             return value
         else:
             value = math.inf
             for move in ordered_moves:
-                new_board = board.clone()
-                new_board.place_piece(*move, self.opponent_id)
-                
-                value = min(
-                    value,
-                    self._minimax(new_board, depth - 1, alpha, beta, True, start_time)
-                )
+                board.play(*move, self.opponent_id)
+                try:
+                    value = min(
+                        value,
+                        self._minimax(board, depth - 1, alpha, beta, True)
+                    )
+                finally:
+                    board.undo()
                 beta = min(beta, value)
                 if alpha >= beta:
                     self.prunes += 1
+                    self.state.record_cutoff(move[0] * self.size + move[1], depth, ply)
                     break
             return value
 
@@ -162,6 +246,14 @@ class AIPlayer(Player):
         # 1. Conectan nuestros lados
         # 2. Bloquean al oponente
         # 3. Están cerca del centro
+        # Distancias del oponente si se ocupa cada casilla, en un solo lote
+        opponent_id = 3 - player_id
+        _, opponent_excluded = self._excluded_distances(board, opponent_id)
+        
+        # Historia de cortes de jugadas anteriores, normalizada a lo sumo 2 puntos
+        history = self.state.history if self.state is not None else None
+        max_history = history.max() if history is not None else 0
+        
         move_scores = []
         for move in moves:
             score = 0
@@ -175,8 +267,7 @@ class AIPlayer(Player):
                 score += move[0]  # Más cerca del lado superior
             
             # Bloquear al oponente
-            opponent_id = 3 - player_id
-            opponent_dist = self._calculate_min_distance(board, opponent_id, exclude=move)
+            opponent_dist = opponent_excluded[move[0] * self.size + move[1]]
             score += opponent_dist * 0.5  # Penalizar movimientos que ayudan al oponente
             
             # Control del centro
@@ -184,6 +275,9 @@ class AIPlayer(Player):
             distance_to_center = math.sqrt((move[0] - center)**2 + (move[1] - center)**2)
             score += (self.size - distance_to_center) * 0.3
             
+            if max_history > 0:
+                score += 2.0 * history[move[0] * self.size + move[1]] / max_history
+            
             move_scores.append((score, move))
         
         # Ordenar por puntuación descendente
@@ -191,13 +285,29 @@ class AIPlayer(Player):
         return [move for (score, move) in move_scores]
 
     def _evaluate(self, board):
-        """Función de evaluación mejorada para HEX"""
+        """Función de evaluación mejorada para HEX (con caché LRU por posición)"""
+        self.cache_probes += 1
+        value = self.eval_cache.get(board.hash)
+        if value is not None:
+            self.cache_hits += 1
+            self.eval_cache.move_to_end(board.hash)
+            return value
+        value = self._evaluate_position(board)
+        self.eval_cache[board.hash] = value
+        if len(self.eval_cache) > self.eval_cache_size:
+            self.eval_cache.popitem(last=False)
+        return value
+
+    def _evaluate_position(self, board):
         # 1. Victoria/derrota inmediata
         if board.check_connection(self.player_id):
             return math.inf
         if board.check_connection(self.opponent_id):
             return -math.inf
         
+        if self.leaf_evaluator is not None:
+            return self.leaf_evaluator.evaluate(board, self.player_id)
+        
         # 2. Distancias potenciales
         player_dist = self._calculate_min_distance(board, self.player_id)
         opponent_dist = self._calculate_min_distance(board, self.opponent_id)
@@ -219,64 +329,84 @@ class AIPlayer(Player):
 
     def _calculate_min_distance(self, board, player_id, exclude=None):
         """Calcula la distancia mínima potencial para conectar los lados"""
-        size = board.size
-        distances = []
-        
-        if player_id == 1:  # Conectar izquierda-derecha
-            starts = [(i, 0) for i in range(size)]
-            targets = [(i, size-1) for i in range(size)]
-        else:  # Conectar arriba-abajo
-            starts = [(0, j) for j in range(size)]
-            targets = [(size-1, j) for j in range(size)]
+        blocked = () if exclude is None else (exclude[0] * board.size + exclude[1],)
+        distances = self._distance_map(board, player_id, True, blocked)
+        distance = self._edge_distance(board, distances, player_id)
+        return distance if distance != math.inf else board.size * 2
+
+    def _edge_distance(self, board, distances, player_id):
+        """Mínimo del mapa de distancias sobre el borde destino del jugador"""
+        _, end_mask = get_geometry(board.size).edge_masks[player_id]
+        return min((d for index, d in enumerate(distances) if (end_mask >> index) & 1),
+                   default=math.inf)
+
+    def _distance_map(self, board, player_id, from_start=True, blocked=()):
+        """0-1 BFS multiorigen desde un borde: cuesta 0 por ficha propia y 1 por casilla vacía"""
+        geometry = get_geometry(board.size)
+        own = board.bits[player_id]
+        opponent = board.bits[3 - player_id]
+        for index in blocked:
+            opponent |= 1 << index
+        start_mask, end_mask = geometry.edge_masks[player_id]
+        sources = start_mask if from_start else end_mask
         
-        for start in starts:
-            if board.board[start[0]][start[1]] == player_id:
-                distance = self._bfs_shortest_path(board, start, targets, player_id, exclude)
-                if distance is not None:
-                    distances.append(distance)
+        distances = [math.inf] * geometry.cells
+        queue = deque()
+        for index in range(geometry.cells):
+            if (sources >> index) & 1 and not (opponent >> index) & 1:
+                if (own >> index) & 1:
+                    distances[index] = 0
+                    queue.appendleft(index)
+                else:
+                    distances[index] = 1
+                    queue.append(index)
         
-        return min(distances) if distances else size * 2
+        neighbors = geometry.neighbors
+        while queue:
+            index = queue.popleft()
+            dist = distances[index]
+            for other in neighbors[index]:
+                if (opponent >> other) & 1:
+                    continue
+                if (own >> other) & 1:
+                    if dist < distances[other]:
+                        distances[other] = dist
+                        queue.appendleft(other)
+                elif dist + 1 < distances[other]:
+                    distances[other] = dist + 1
+                    queue.append(other)
+        return distances
 
-    def _bfs_shortest_path(self, board, start, targets, player_id, exclude=None):
-        """BFS optimizado para encontrar el camino más corto potencial"""
-        size = board.size
-        visited = [[False] * size for _ in range(size)]
-        queue = deque([(start[0], start[1], 0)])
-        visited[start[0]][start[1]] = True
+    def _excluded_distances(self, board, player_id):
+        """Distancia del jugador y, para cada casilla vacía, la distancia si se le quita
         
-        while queue:
-            row, col, dist = queue.popleft()
-            
-            if (row, col) in targets:
-                return dist
-            
-            for r, c in self.get_adjacent_hexes(row, col):
-                if 0 <= r < size and 0 <= c < size and not visited[r][c]:
-                    if (r, c) == exclude:
-                        continue
-                    if board.board[r][c] == player_id or board.board[r][c] == 0:
-                        visited[r][c] = True
-                        queue.append((r, c, dist + 1))
+        Todo camino mínimo pasa por exactamente una casilla vacía de cada nivel
+        (distancia desde el borde inicial). Si una casilla es la única de su nivel
+        sobre caminos mínimos, quitarla alarga el camino (se estima +1); si no, no.
+        """
+        geometry = get_geometry(board.size)
+        from_start = self._distance_map(board, player_id, True)
+        from_end = self._distance_map(board, player_id, False)
+        distance = self._edge_distance(board, from_start, player_id)
+        if distance == math.inf:
+            return board.size * 2, [board.size * 2] * geometry.cells
+        excluded = [distance] * geometry.cells
         
-        return None
-    
-    def get_adjacent_hexes(self, row: int, col: int) -> list:
+        occupied = board.bits[1] | board.bits[2]
+        on_path = [index for index in range(geometry.cells)
+                   if not (occupied >> index) & 1
+                   and from_start[index] + from_end[index] - 1 == distance]
+        levels = {}
+        for index in on_path:
+            levels[from_start[index]] = levels.get(from_start[index], 0) + 1
+        for index in on_path:
+            if levels[from_start[index]] == 1:
+                excluded[index] = distance + 1
+        return distance, excluded
+
+    def get_adjacent_hexes(self, row: int, col: int) -> tuple:
         """Devuelve las casillas adyacentes según even-r"""
-        if row % 2 == 0:  # Fila par
-            directions = [
-                (0, -1), (0, 1),    # Izquierda, derecha
-                (-1, 0), (1, 0),    # Arriba, abajo
-                (-1, 1), (1, 1)     # Arriba-derecha, abajo-derecha
-            ]
-        else:  # Fila impar
-            directions = [
-                (0, -1), (0, 1),    # Izquierda, derecha
-                (-1, 0), (1, 0),    # Arriba, abajo
-                (-1, -1), (1, -1)   # Arriba-izquierda, abajo-izquierda
-            ]
-        
-        return [(row + dr, col + dc) for dr, dc in directions 
-                if 0 <= row + dr < self.size and 0 <= col + dc < self.size]
+        return get_geometry(self.size).adjacent(row, col)
 
     def _count_bridges(self, board, player_id):
         """Cuenta puentes potenciales (dos conexiones separadas por una celda vacía)"""
@@ -0,0 +1,146 @@
+import time
+from board import HexBoard
+
+class TimeManager:
+    """Reparto del tiempo entre jugadas y control de parada de la búsqueda
+
+    El reloj monotónico se consulta cada tantos nodos como quepan en
+    `poll_interval` segundos según el coste medido por nodo (a lo sumo
+    `check_every`), así un nodo caro no retrasa la parada. Con un
+    presupuesto por partida (`game_time`) cada jugada recibe una parte según la
+    fase; el tiempo que no se gasta queda en el presupuesto de las siguientes.
+    Entre profundidades se estima con el factor de ramificación observado si la
+    siguiente iteración puede terminar antes de agotar el tiempo.
+    """
+
+    def __init__(self, game_time: float = None, margin: float = 0.03,
+                 check_every: int = 256, expected_fill: float = 0.6, poll_interval: float = 0.002):
+        self.game_time = game_time
+        self.remaining = game_time
+        self.margin = margin            # Reserva para deshacer la búsqueda y responder
+        self.check_every = check_every  # Máximo de nodos entre consultas del reloj
+        self.poll_interval = poll_interval
+        self.poll_nodes = 1             # Nodos entre consultas, ajustado al coste por nodo
+        self.expected_fill = expected_fill  # Fracción del tablero ocupada al acabar
+        self.overshoot = 0.0            # Mayor retraso observado respecto al límite duro
+        self.stop_requested = False
+        self.start_time = time.monotonic()
+        self.soft_limit = self.hard_limit = float('inf')
+        self.nodes = 0
+        self.countdown = 1
+        self.last_poll = self.start_time
+        self.iterations = []            # (nodos, segundos) de cada profundidad completada
+
+    def new_game(self):
+        """Recupera el presupuesto completo de la partida"""
+        self.remaining = self.game_time
+
+    def start(self, board: HexBoard, move_time: float = None) -> float:
+        """Empieza una jugada; devuelve el tiempo objetivo en segundos
+
+        `move_time` es el límite duro de esta jugada (el que impone quien llama).
+        """
+        self.start_time = time.monotonic()
+        reserve = self.margin + self.overshoot
+        hard = float('inf') if move_time is None else max(0.0, move_time - reserve)
+        soft = hard
+        if self.remaining is not None:
+            soft = min(hard, self.allocate(board))
+            hard = min(hard, max(0.0, self.remaining - reserve))
+        self._reset(soft, hard)
+        return soft
+
+    def start_deadline(self, deadline: float):
+        """Empieza a contar hasta un instante absoluto de time.monotonic()"""
+        self.start_time = time.monotonic()
+        budget = max(0.0, deadline - self.start_time)
+        self._reset(budget, budget)
+
+    def start_infinite(self):
+        """Sin límite de tiempo: solo se para con stop() (reflexión en segundo plano)"""
+        self.start_time = time.monotonic()
+        self._reset(float('inf'), float('inf'))
+
+    def _reset(self, soft: float, hard: float):
+        self.soft_limit = self.start_time + soft
+        self.hard_limit = self.start_time + hard
+        self.stop_requested = False
+        self.nodes = 0
+        self.countdown = self.poll_nodes
+        self.last_poll = self.start_time
+        self.iterations = []
+        self.iteration_start = (0, self.start_time)
+
+    def allocate(self, board: HexBoard) -> float:
+        """Parte del presupuesto restante para esta jugada según la fase de la partida"""
+        cells = board.size * board.size
+        stones = board.stones
+        phase = min(stones / (self.expected_fill * cells), 1.0)
+        # Jugadas propias que quedan (al menos unas pocas por si la partida se alarga)
+        moves_left = max(4.0, (self.expected_fill * cells - stones) / 2)
+        # Más tiempo en el medio juego que en la apertura o el final
+        weight = 0.6 + 3.2 * phase * (1.0 - phase)
+        return self.remaining / moves_left * weight
+
+    def stop(self):
+        """Pide que la búsqueda termine en la próxima consulta"""
+        self.stop_requested = True
+
+    def check(self):
+        """Llamar en cada nodo: lanza TimeoutError al pasar el límite duro o tras stop()"""
+        self.nodes += 1
+        self.countdown -= 1
+        if self.countdown <= 0:
+            now = time.monotonic()
+            if self.stop_requested or now >= self.hard_limit:
+                raise TimeoutError()
+            # Tantos nodos como quepan en poll_interval al ritmo del último tramo (a lo sumo el doble)
+            elapsed = now - self.last_poll
+            fitting = int(self.poll_nodes * self.poll_interval / elapsed) if elapsed > 0 else self.check_every
+            self.poll_nodes = max(1, min(self.check_every, 2 * self.poll_nodes, fitting))
+            self.countdown = self.poll_nodes
+            self.last_poll = now
+
+    def expired(self) -> bool:
+        """Consulta directa del reloj (entre iteraciones o partidas aleatorias)"""
+        return self.stop_requested or time.monotonic() >= self.hard_limit
+
+    def begin_iteration(self):
+        self.iteration_start = (self.nodes, time.monotonic())
+
+    def end_iteration(self):
+        """Registra los nodos y el tiempo de la profundidad que acaba de completarse"""
+        nodes, started = self.iteration_start
+        self.iterations.append((self.nodes - nodes, time.monotonic() - started))
+
+    def can_start_iteration(self) -> bool:
+        """¿Terminará la siguiente profundidad antes del límite?
+
+        La duración prevista es la de la última iteración multiplicada por el
+        factor de ramificación efectivo. Alfa-beta alterna profundidades pares e
+        impares baratas y caras, así que se usa la media geométrica de los dos
+        últimos cocientes de nodos cuando los hay.
+        """
+        now = time.monotonic()
+        if self.stop_requested or now >= self.soft_limit:
+            return False
+        if len(self.iterations) < 2:
+            return True
+        window = self.iterations[-3:]
+        first_nodes, (last_nodes, last_time) = window[0][0], window[-1]
+        steps = len(window) - 1
+        branching = (last_nodes / first_nodes) ** (1.0 / steps) if first_nodes else 1.0
+        predicted = last_time * max(branching, 1.0)
+        return now + predicted <= self.hard_limit and now + predicted / 2 <= self.soft_limit
+
+    def finish(self) -> float:
+        """Cierra la jugada: descuenta el tiempo usado y aprende el retraso de respuesta"""
+        now = time.monotonic()
+        used = now - self.start_time
+        if self.hard_limit != float('inf'):
+            # Si se respondió más tarde que el margen tras el límite, reservar más
+            late = now - self.hard_limit - self.margin
+            self.overshoot = max(self.overshoot * 0.5, late, 0.0)
+        if self.remaining is not None:
+            self.remaining = max(0.0, self.remaining - used)
+        return used
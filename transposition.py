@@ -0,0 +1,74 @@
+import numpy as np
+
+# Tipos de cota guardados en cada entrada
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Se combina con el hash del tablero cuando juega el jugador que maximiza
+SIDE_TO_MOVE_KEY = 0x9E3779B97F4A7C15
+
+class TranspositionTable:
+    """Tabla de transposición de tamaño fijo con límite de memoria en MB"""
+
+    # Bytes por entrada: clave, valor, profundidad, cota, jugada y generación
+    ENTRY_BYTES = 8 + 8 + 2 + 1 + 2 + 1
+    POLICIES = ('depth', 'always')
+
+    def __init__(self, max_mb: float = 16, policy: str = 'depth'):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Política de reemplazo desconocida: {policy}")
+        self.policy = policy
+
+        # Mayor potencia de dos que cabe en el límite (índice por máscara)
+        entries = max(1, int(max_mb * 1024 * 1024) // self.ENTRY_BYTES)
+        self.capacity = 1 << (entries.bit_length() - 1)
+        self.mask = self.capacity - 1
+
+        self.keys = np.zeros(self.capacity, dtype=np.uint64)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self.depths = np.full(self.capacity, -1, dtype=np.int16)
+        self.flags = np.zeros(self.capacity, dtype=np.int8)
+        self.moves = np.full(self.capacity, -1, dtype=np.int16)
+        # Generación de búsqueda de cada entrada: las viejas se reemplazan primero
+        self.ages = np.zeros(self.capacity, dtype=np.uint8)
+        self.generation = 0
+        # Consultas y aciertos desde new_search() (estadísticas de la jugada)
+        self.probes = 0
+        self.hits = 0
+
+    def clear(self):
+        """Vacía la tabla sin liberar la memoria"""
+        self.depths.fill(-1)
+        self.moves.fill(-1)
+
+    def new_search(self):
+        """Empieza una búsqueda nueva: las entradas anteriores siguen valiendo pero envejecen"""
+        self.generation = (self.generation + 1) % 256
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, key: int):
+        """Devuelve (profundidad, cota, valor, jugada) o None si no hay entrada"""
+        slot = key & self.mask
+        self.probes += 1
+        if self.depths[slot] < 0 or int(self.keys[slot]) != key:
+            return None
+        self.hits += 1
+        return (int(self.depths[slot]), int(self.flags[slot]),
+                float(self.values[slot]), int(self.moves[slot]))
+
+    def store(self, key: int, depth: int, flag: int, value: float, move: int):
+        """Guarda una entrada según la política de reemplazo"""
+        slot = key & self.mask
+        if self.policy == 'depth':
+            # Preferir profundidad: no pisar una búsqueda más profunda de otra
+            # posición salvo que sea de una búsqueda anterior
+            stored_depth = self.depths[slot]
+            if (stored_depth > depth and self.ages[slot] == self.generation
+                    and int(self.keys[slot]) != key):
+                return
+        self.keys[slot] = key
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.flags[slot] = flag
+        self.moves[slot] = move
+        self.ages[slot] = self.generation